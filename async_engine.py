@@ -0,0 +1,957 @@
+"""
+学习强国自动化助手的 asyncio 引擎
+
+不经过 Selenium/WebDriver，直接通过 Chrome DevTools Protocol(CDP) 驱动 Edge。
+所有操作（阅读、观看、查询积分、提取二维码）都是协程，一个事件循环可以同时驱动
+多个标签页和多个账号，等待期间不占用线程。
+
+用法: python async_engine.py [accounts.json]
+"""
+import asyncio
+import base64
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from main_ai import (
+    ARTICLE_LIST_SELECTOR, AUTONOMOUS_DWELL, AUTO_DWELL_SCRIPT, BLOCKED_URL_PATTERNS, CATALOG_REFRESH_LIMIT,
+    CONCURRENT_TABS, DWELL_HEARTBEAT, DWELL_STATUS_SCRIPT, HOME_URL, JS_PROBE_SELECTORS, JS_QUERY_ALL,
+    LIGHT_MODE, LIST_ITEMS_SCRIPT, LOCAL_STORAGE_RESTORE_SCRIPT, LOGIN_EVENT_TIMEOUT, LOGIN_QRCODE_XPATHS,
+    LOGIN_TIMEOUT, LOGIN_URL, LOGIN_WATCH_SCRIPT, MAX_IDLE_ROUNDS, POINTS_URL, SCORE_API_TIMEOUT, SCORE_API_URL,
+    SCORE_CARDS_SCRIPT, SCORE_FETCH_SCRIPT, SITE_DOMAIN, TOKEN_COOKIE_KEYS, VIDEO_CHANNEL_URL, VIDEO_END_MARGIN,
+    VIDEO_LIST_SELECTORS, VIDEO_PLAYER_XPATHS, VIDEO_POINTS_PER_VIDEO, WAIT_TIMEOUT, ContentCatalog,
+    SelectorRegistry, SessionStore, _available_memory_mb, article_read_seconds, default_video_watch_seconds,
+    default_worker_count, find_edge_binary, load_account_profiles, parse_score_items, plan_videos,
+    score_items_from_api, video_watch_limit,
+)
+
+BROWSER_START_TIMEOUT = 30  # 等待浏览器开放调试端口的超时时间(秒)
+POLL_INTERVAL = 0.2  # 等待页面条件成立时的检查间隔(秒)
+ASYNC_HEADLESS = False  # 是否以无头模式启动浏览器
+SHARED_BROWSER = True  # 多账号时共用一个浏览器进程，每个账号一个独立的浏览器上下文
+MEMORY_PER_CONTEXT_MB = 150  # 每个浏览器上下文预估占用内存(MB)，用于限制同时运行的账号数量
+JS_HEAP_SAMPLE_INTERVAL = 10  # 运行期间采样本账号标签页JS堆大小的间隔(秒)
+# 启动Edge时附加的命令行参数
+EDGE_ARGUMENTS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--disable-notifications",
+    "--disable-popup-blocking",
+    "--mute-audio",
+    "--autoplay-policy=no-user-gesture-required",
+]
+
+
+class CDPError(Exception):
+    """CDP命令返回错误或连接已断开"""
+
+
+def selector_expression(selector):
+    """生成判断 {"type", "value"} 选择器是否存在的JS表达式"""
+    return "(function() {%s return queryAll(%s, %s).length > 0; })()" % (
+        JS_QUERY_ALL, json.dumps(selector["type"]), json.dumps(selector["value"]))
+
+
+class CDPConnection:
+    """
+    一条到浏览器的CDP websocket连接
+
+    所有标签页共用这条连接，通过 sessionId 区分命令和事件
+    """
+
+    def __init__(self, websocket, logger=None):
+        self.websocket = websocket
+        self.logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+        self._next_id = 0
+        self._pending = {}
+        self._listeners = []
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, url, logger=None):
+        # 页面截图等消息可能超过默认的1MB限制
+        websocket = await websockets.connect(url, max_size=None, ping_interval=None)
+        return cls(websocket, logger)
+
+    async def send(self, method, params=None, session_id=None, timeout=WAIT_TIMEOUT):
+        """发送CDP命令并等待结果"""
+        self._next_id += 1
+        message_id = self._next_id
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps(message))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def wait_for_event(self, method, session_id=None, predicate=None):
+        """
+        注册一次性事件监听，返回事件参数的 future
+
+        需要在触发事件的命令之前调用，避免错过事件
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._listeners.append((method, session_id, predicate, future))
+        return future
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._pending.get(message['id'])
+                    if future and not future.done():
+                        if 'error' in message:
+                            future.set_exception(CDPError(message['error'].get('message', message['error'])))
+                        else:
+                            future.set_result(message.get('result', {}))
+                    continue
+                self._dispatch(message)
+        except Exception as e:
+            self.logger.debug(f"CDP连接读取结束: {e}")
+        finally:
+            for future in list(self._pending.values()) + [item[3] for item in self._listeners]:
+                if not future.done():
+                    future.set_exception(CDPError("CDP连接已断开"))
+            self._listeners = []
+
+    def _dispatch(self, message):
+        method = message.get('method')
+        session_id = message.get('sessionId')
+        params = message.get('params', {})
+        remaining = []
+        for listener in self._listeners:
+            listen_method, listen_session, predicate, future = listener
+            if future.done():
+                continue
+            if listen_method == method and listen_session in (None, session_id) and \
+                    (predicate is None or predicate(params)):
+                future.set_result(params)
+            else:
+                remaining.append(listener)
+        self._listeners = remaining
+
+    async def close(self):
+        self._reader.cancel()
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+
+class Page:
+    """一个标签页，对应一个CDP target 会话"""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+        self.url = 'about:blank'
+
+    async def send(self, method, params=None, timeout=WAIT_TIMEOUT):
+        return await self.connection.send(method, params, self.session_id, timeout)
+
+    async def goto(self, url, ready=None, timeout=WAIT_TIMEOUT):
+        """
+        打开地址，等到DOM加载完成；ready 为JS表达式或选择器时再等到它成立
+        """
+        loaded = self.connection.wait_for_event('Page.domContentEventFired', self.session_id)
+        result = await self.send('Page.navigate', {'url': url}, timeout)
+        if result.get('errorText'):
+            loaded.cancel()
+            raise CDPError(f"打开页面失败: {result['errorText']}")
+        await asyncio.wait_for(loaded, timeout)
+        self.url = url
+        if ready:
+            await self.wait_for(ready, timeout)
+
+    async def evaluate(self, expression, await_promise=False, timeout=WAIT_TIMEOUT):
+        """在页面中执行JS表达式并返回结果的值"""
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression,
+            'returnByValue': True,
+            'awaitPromise': await_promise,
+        }, timeout)
+        if result.get('exceptionDetails'):
+            details = result['exceptionDetails']
+            raise CDPError(details.get('exception', {}).get('description') or details.get('text'))
+        return result.get('result', {}).get('value')
+
+    async def call(self, script, *args, timeout=WAIT_TIMEOUT):
+        """执行 Selenium execute_script 风格的脚本（使用 arguments 和 return）"""
+        expression = "(function() { %s }).apply(null, %s)" % (script, json.dumps(args))
+        return await self.evaluate(expression, timeout=timeout)
+
+    async def call_async(self, script, *args, timeout=WAIT_TIMEOUT):
+        """执行 Selenium execute_async_script 风格的脚本（最后一个参数是回调）"""
+        expression = """new Promise(function(resolve) {
+            (function() { %s }).apply(null, %s.concat([resolve]));
+        })""" % (script, json.dumps(args))
+        return await self.evaluate(expression, await_promise=True, timeout=timeout)
+
+    async def wait_for(self, condition, timeout=WAIT_TIMEOUT):
+        """
+        等待JS表达式或 {"type", "value"} 选择器成立
+
+        返回表达式的值，超时抛出 asyncio.TimeoutError
+        """
+        if isinstance(condition, dict):
+            condition = selector_expression(condition)
+        end_time = time.time() + timeout
+        while True:
+            try:
+                value = await self.evaluate(condition)
+                if value:
+                    return value
+            except CDPError:
+                # 页面跳转中执行上下文会被销毁，稍后重试
+                pass
+            if time.time() >= end_time:
+                raise asyncio.TimeoutError(f"等待页面条件超时: {condition[:80]}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def scroll_by(self, offset):
+        await self.evaluate(f"window.scrollBy(0, {int(offset)})")
+
+    async def close(self):
+        try:
+            await self.connection.send('Target.closeTarget', {'targetId': self.target_id})
+        except Exception:
+            pass
+
+
+class EdgeBrowser:
+    """通过远程调试端口启动并控制的Edge浏览器进程"""
+
+    def __init__(self, process, connection, user_data_dir, temporary_dir=None, logger=None):
+        self.process = process
+        self.connection = connection
+        self.user_data_dir = user_data_dir
+        self.temporary_dir = temporary_dir
+        self.logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+
+    @classmethod
+    async def launch(cls, user_data_dir=None, headless=None, logger=None):
+        """
+        启动Edge并连接到它的CDP端口
+
+        参数：
+            user_data_dir: 浏览器数据目录，默认使用临时目录并在关闭时删除
+            headless: 是否无头模式，默认使用 ASYNC_HEADLESS
+        """
+        if websockets is None:
+            raise RuntimeError("缺少依赖 websockets，请安装: pip install websockets")
+        binary = find_edge_binary()
+        if not binary:
+            raise RuntimeError("未找到Edge浏览器，请在 main_ai.py 中设置 EDGE_BINARY_PATH")
+        if headless is None:
+            headless = ASYNC_HEADLESS
+
+        temporary_dir = None
+        if user_data_dir is None:
+            temporary_dir = user_data_dir = tempfile.mkdtemp(prefix="xuexi_edge_")
+        os.makedirs(user_data_dir, exist_ok=True)
+        # 端口号由浏览器选择后写入这个文件
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        arguments = [binary, "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}"] + EDGE_ARGUMENTS
+        if headless:
+            arguments.append("--headless=new")
+        if LIGHT_MODE:
+            arguments.append("--blink-settings=imagesEnabled=false")
+        arguments.append("about:blank")
+        process = subprocess.Popen(arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        end_time = time.time() + BROWSER_START_TIMEOUT
+        while True:
+            try:
+                with open(port_file, 'r') as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    break
+            except OSError:
+                pass
+            if process.poll() is not None or time.time() >= end_time:
+                process.kill()
+                raise RuntimeError("Edge浏览器启动失败或没有开放调试端口")
+            await asyncio.sleep(POLL_INTERVAL)
+
+        connection = await CDPConnection.connect(f"ws://127.0.0.1:{lines[0]}{lines[1]}", logger)
+        return cls(process, connection, user_data_dir, temporary_dir, logger)
+
+    async def new_page(self, url='about:blank', browser_context_id=None):
+        """新建标签页并附加到它"""
+        params = {'url': url}
+        if browser_context_id:
+            params['browserContextId'] = browser_context_id
+        target = await self.connection.send('Target.createTarget', params)
+        attached = await self.connection.send('Target.attachToTarget',
+                                              {'targetId': target['targetId'], 'flatten': True})
+        page = Page(self.connection, target['targetId'], attached['sessionId'])
+        await page.send('Page.enable')
+        return page
+
+    async def new_context(self):
+        """新建独立的浏览器上下文（类似隐身窗口，cookie和存储互不共享），返回上下文ID"""
+        result = await self.connection.send('Target.createBrowserContext', {'disposeOnDetach': True})
+        return result['browserContextId']
+
+    async def close_context(self, browser_context_id):
+        """关闭浏览器上下文及其中的所有标签页"""
+        try:
+            await self.connection.send('Target.disposeBrowserContext', {'browserContextId': browser_context_id})
+        except Exception as e:
+            self.logger.debug(f"关闭浏览器上下文失败: {e}")
+
+    async def close(self):
+        try:
+            await self.connection.send('Browser.close', timeout=5)
+        except Exception:
+            pass
+        await self.connection.close()
+        try:
+            self.process.wait(timeout=10)
+        except Exception:
+            self.process.kill()
+        if self.temporary_dir:
+            shutil.rmtree(self.temporary_dir, ignore_errors=True)
+
+
+class AsyncAssistant:
+    """
+    与 XueXiQiangGuoAssistant 功能相同的协程版本
+
+    每篇文章和每个视频在自己的标签页中进行，同时打开的标签页数量由 concurrent_tabs 限制。
+    传入 browser_context_id 时所有标签页都在该上下文中打开，多个账号可以共用一个浏览器
+    """
+
+    def __init__(self, browser, account=None, concurrent_tabs=None, browser_context_id=None, logger=None):
+        self.browser = browser
+        self.account = account
+        self.browser_context_id = browser_context_id
+        self.concurrent_tabs = concurrent_tabs or CONCURRENT_TABS
+        self.logger = logger or self._setup_logger()
+        self.session_store = SessionStore(logger=self.logger)
+        self.catalog = ContentCatalog(account, logger=self.logger)
+        self.selectors = SelectorRegistry(logger=self.logger)
+        self.page = None
+        self._pages = set()
+        self._init_scripts = []
+        self.peak_js_heap_mb = 0
+
+    def _setup_logger(self):
+        name = 'AsyncAssistant' + (f'.{self.account}' if self.account else '')
+        logger = logging.getLogger(name)
+        if not logger.handlers:
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = logging.StreamHandler()
+            prefix = f'[{self.account}] ' if self.account else ''
+            handler.setFormatter(logging.Formatter(f'%(asctime)s - {prefix}%(levelname)s - %(message)s'))
+            logger.addHandler(handler)
+        return logger
+
+    async def new_page(self, url='about:blank'):
+        """新建标签页，并注入恢复会话时需要的脚本"""
+        page = await self.browser.new_page(browser_context_id=self.browser_context_id)
+        self._pages.add(page)
+        if LIGHT_MODE:
+            await page.send('Network.enable')
+            await page.send('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        for source in self._init_scripts:
+            await page.send('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+        if url != 'about:blank':
+            await page.goto(url)
+        return page
+
+    async def start(self):
+        """打开主标签页并恢复已保存的登录会话"""
+        self.page = await self.new_page()
+        await self.restore_session()
+
+    async def _get_cookies(self):
+        """读取本账号的全部cookie，使用独立上下文时只读取该上下文的cookie"""
+        if self.browser_context_id:
+            result = await self.browser.connection.send('Storage.getCookies',
+                                                        {'browserContextId': self.browser_context_id})
+        else:
+            result = await self.page.send('Network.getAllCookies')
+        return result.get('cookies', [])
+
+    async def _set_cookies(self, cookies):
+        if self.browser_context_id:
+            await self.browser.connection.send('Storage.setCookies', {'cookies': cookies,
+                                                                      'browserContextId': self.browser_context_id})
+        else:
+            await self.page.send('Network.setCookies', {'cookies': cookies})
+
+    async def close_page(self, page):
+        self._pages.discard(page)
+        await page.close()
+
+    async def js_heap_usage(self):
+        """
+        统计本账号所有打开的标签页的JS堆大小(MB)，并记录峰值
+
+        只包含JS堆，不包含渲染进程中的DOM、图片和媒体缓冲等，账号实际占用的内存比这个数大
+        """
+        total = 0
+        for page in list(self._pages):
+            try:
+                metrics = await page.send('Performance.getMetrics')
+            except CDPError:
+                try:
+                    await page.send('Performance.enable')
+                    metrics = await page.send('Performance.getMetrics')
+                except CDPError:
+                    continue
+            values = {metric['name']: metric['value'] for metric in metrics.get('metrics', [])}
+            total += values.get('JSHeapTotalSize', 0)
+        heap_mb = total / (1024 * 1024)
+        self.peak_js_heap_mb = max(self.peak_js_heap_mb, heap_mb)
+        return heap_mb
+
+    async def sample_js_heap(self, interval=JS_HEAP_SAMPLE_INTERVAL):
+        """每 interval 秒采样一次JS堆大小，直到任务被取消"""
+        while True:
+            try:
+                await self.js_heap_usage()
+            except Exception as e:
+                self.logger.debug(f"采样JS堆大小失败: {e}")
+            await asyncio.sleep(interval)
+
+    async def restore_session(self):
+        """把 SessionStore 中保存的cookie和localStorage写入浏览器"""
+        session = self.session_store.load(self.account)
+        if not session:
+            return False
+        if self.session_store.is_expired(session):
+            self.logger.info("已保存的登录会话已过期，需要重新扫码")
+            self.session_store.clear(self.account)
+            return False
+
+        try:
+            await self._set_cookies(session['cookies'])
+            local_storage = session.get('local_storage', {})
+            if local_storage:
+                self._init_scripts.append(LOCAL_STORAGE_RESTORE_SCRIPT % json.dumps(local_storage))
+                await self.page.send('Page.addScriptToEvaluateOnNewDocument', {'source': self._init_scripts[-1]})
+            self.logger.info(f"已恢复保存的登录会话（{len(session['cookies'])} 个cookie）")
+            return True
+        except Exception as e:
+            self.logger.warning(f"恢复登录会话失败: {e}")
+            return False
+
+    async def save_session(self):
+        """保存浏览器的全部cookie和主标签页的localStorage"""
+        try:
+            cookies = await self._get_cookies()
+            origin = await self.page.evaluate("window.location.origin")
+            items = await self.page.evaluate("""(function() {
+                var items = {};
+                for (var i = 0; i < localStorage.length; i++) {
+                    var key = localStorage.key(i);
+                    items[key] = localStorage.getItem(key);
+                }
+                return items;
+            })()""")
+            self.session_store.write(self.account, cookies,
+                                     {origin: items or {}} if origin and origin.startswith('http') else {})
+            return True
+        except Exception as e:
+            self.logger.warning(f"保存登录会话失败: {e}")
+            return False
+
+    async def _ensure_site(self):
+        """积分接口需要携带xuexi.cn的cookie，主标签页不在该域名下时先打开首页"""
+        if SITE_DOMAIN not in self.page.url:
+            await self.page.goto(HOME_URL)
+
+    async def _login_token_values(self):
+        cookies = await self._get_cookies()
+        return {cookie.get('name', ''): cookie.get('value', '')
+                for cookie in cookies
+                if any(key in cookie.get('name', '').lower() for key in TOKEN_COOKIE_KEYS)
+                and len(cookie.get('value', '')) > 10}
+
+    async def _wait_for_qrcode(self, timeout=WAIT_TIMEOUT):
+        """
+        等待登录iframe中出现二维码图片（LOGIN_QRCODE_XPATHS 中任意一个），返回图片的 data URL
+
+        src 不是 data URL 时在iframe中重新请求图片并转成 data URL，轻量模式禁用了图片渲染也能取到二维码。
+        iframe同源时通过 contentWindow 在iframe中读取；跨域时iframe是单独的 iframe target，附加到它后读取
+
+        返回：
+            二维码图片的 data URL，超时或无法读取时返回None
+        """
+        probe = """(function() {%s%s
+            var found = probeSelectors(%s);
+            var src = found ? found.element.getAttribute('src') : null;
+            if (!src) return false;
+            if (src.indexOf('data:') === 0) return src;
+            return fetch(src).then(function(response) { return response.blob(); }).then(function(blob) {
+                return new Promise(function(resolve) {
+                    var reader = new FileReader();
+                    reader.onload = function() { resolve(reader.result); };
+                    reader.readAsDataURL(blob);
+                });
+            }).catch(function() { return src; });
+        })()""" % (JS_QUERY_ALL, JS_PROBE_SELECTORS,
+                   json.dumps([{"type": "xpath", "value": xpath} for xpath in LOGIN_QRCODE_XPATHS]))
+        same_origin = """(function() {
+            var frame = document.getElementById('ddlogin-iframe');
+            if (!frame) return false;
+            try { return frame.contentWindow.eval(%s); } catch (e) { return null; }
+        })()""" % json.dumps(probe)
+
+        end_time = time.time() + timeout
+        while time.time() < end_time:
+            try:
+                src = await self.page.evaluate(same_origin, await_promise=True)
+                if src is None:
+                    src = await self._probe_frame_targets(probe)
+                if src:
+                    return src
+            except CDPError:
+                # 登录页或iframe跳转中，稍后重试
+                pass
+            await asyncio.sleep(POLL_INTERVAL)
+        return None
+
+    async def _probe_frame_targets(self, expression):
+        """在本账号所有跨域iframe target中执行表达式（可以返回Promise），返回第一个为真的结果"""
+        connection = self.browser.connection
+        targets = await connection.send('Target.getTargets')
+        for info in targets.get('targetInfos', []):
+            if info.get('type') != 'iframe':
+                continue
+            if self.browser_context_id and info.get('browserContextId') != self.browser_context_id:
+                continue
+            attached = await connection.send('Target.attachToTarget', {'targetId': info['targetId'], 'flatten': True})
+            try:
+                value = await Page(connection, info['targetId'], attached['sessionId']).evaluate(
+                    expression, await_promise=True)
+                if value:
+                    return value
+            finally:
+                await connection.send('Target.detachFromTarget', {'sessionId': attached['sessionId']})
+        return None
+
+    async def extract_login_qrcode(self, output_path=None):
+        """
+        打开登录页，把登录iframe中的二维码图片保存到文件
+
+        与 Selenium 版本一样从图片的 src 读取图片数据（轻量模式禁用了图片渲染，截图可能是空白的）；
+        读取不到时按iframe位置截图
+        """
+        try:
+            if output_path is None:
+                suffix = f"_{self.account}" if self.account else ""
+                output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           f"login_qrcode{suffix}.png")
+
+            await self.page.goto(LOGIN_URL, "document.getElementById('ddlogin-iframe') !== null")
+            src = await self._wait_for_qrcode()
+            if src and 'base64,' in src:
+                with open(output_path, 'wb') as f:
+                    f.write(base64.b64decode(src.split('base64,', 1)[1]))
+                self.logger.info(f"二维码已保存到: {output_path}")
+                return output_path
+
+            self.logger.warning("无法读取二维码图片数据，改为截图" +
+                                ("（轻量模式禁用了图片，截图可能是空白的）" if LIGHT_MODE else ""))
+            rect = await self.page.evaluate("""(function() {
+                var frame = document.getElementById('ddlogin-iframe');
+                frame.scrollIntoView({block: 'center'});
+                var r = frame.getBoundingClientRect();
+                return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+            })()""")
+            rect['scale'] = 1
+            shot = await self.page.send('Page.captureScreenshot', {'format': 'png', 'clip': rect})
+            with open(output_path, 'wb') as f:
+                f.write(base64.b64decode(shot['data']))
+            self.logger.info(f"二维码已保存到: {output_path}")
+            return output_path
+        except Exception as e:
+            self.logger.error(f"提取二维码时发生错误: {e}")
+            return None
+
+    async def wait_for_login(self, timeout=None):
+        """在登录页中等待URL、cookie或登录iframe消息等登录事件，不离开二维码页面"""
+        if timeout is None:
+            timeout = LOGIN_TIMEOUT
+
+        self.logger.info("请使用学习强国APP扫描二维码登录...")
+        start_time = time.time()
+        initial_tokens = await self._login_token_values()
+        while time.time() - start_time < timeout:
+            try:
+                # 页面内提前1秒自行结束，不让等待超时后留下仍在运行的定时器
+                reason = await self.page.call_async(LOGIN_WATCH_SCRIPT, (LOGIN_EVENT_TIMEOUT - 1) * 1000,
+                                                    timeout=LOGIN_EVENT_TIMEOUT)
+            except asyncio.TimeoutError:
+                reason = 'timeout'
+            except CDPError:
+                # 页面跳转会销毁正在等待的脚本，这本身就是登录事件
+                reason = 'navigation'
+                await asyncio.sleep(1)
+            if reason == 'timeout':
+                self.logger.info("仍在等待登录...")
+                continue
+
+            current_url = await self.page.evaluate("window.location.href") or ''
+            tokens = await self._login_token_values()
+            if "login.html" not in current_url or (tokens and tokens != initial_tokens):
+                self.page.url = current_url
+                self.logger.info(f"登录验证成功！（触发事件: {reason}，等待{time.time() - start_time:.1f}秒）")
+                return True
+
+        self.logger.warning("登录等待超时")
+        return False
+
+    async def login(self):
+        """会话有效时直接通过，否则提取二维码并等待扫码，登录后保存会话"""
+        await self._ensure_site()
+        if await self.read_score_items():
+            self.logger.info("已保存的登录会话有效，跳过扫码")
+            return True
+        if not await self.extract_login_qrcode():
+            return False
+        if not await self.wait_for_login():
+            return False
+        await self.save_session()
+        return True
+
+    async def fetch_score_items(self):
+        """在主标签页中用页面的cookie请求积分接口，失败时返回None"""
+        try:
+            await self._ensure_site()
+            data = await self.page.call_async(SCORE_FETCH_SCRIPT, SCORE_API_URL, timeout=SCORE_API_TIMEOUT)
+            return score_items_from_api(data) or None
+        except Exception as e:
+            self.logger.debug(f"请求积分接口失败: {e}")
+            return None
+
+    async def _score_items_from_page(self):
+        """打开积分页，从积分卡片中读取积分；被重定向到登录页或读取失败时返回None"""
+        try:
+            await self.page.goto(POINTS_URL, "document.querySelector('.my-points-card') !== null || "
+                                             "window.location.href.indexOf('login.html') !== -1")
+            if "login.html" in (await self.page.evaluate("window.location.href") or ''):
+                return None
+            cards = await self.page.call(SCORE_CARDS_SCRIPT)
+            return [tuple(card) for card in cards or []] or None
+        except (CDPError, asyncio.TimeoutError) as e:
+            self.logger.debug(f"读取积分页失败: {e}")
+            return None
+
+    async def read_score_items(self):
+        """优先请求积分接口，失败时打开积分页读取积分卡片，都失败时返回None"""
+        score_items = await self.fetch_score_items()
+        if score_items:
+            return score_items
+        self.logger.debug("积分接口不可用，改为读取积分页")
+        return await self._score_items_from_page()
+
+    async def check_score(self):
+        """查看当前学习积分，返回文章和视频的积分状态"""
+        score_status, _ = parse_score_items(await self.read_score_items() or [])
+        self.logger.info(f"积分进度: 文章 {score_status['article']['current']}/{score_status['article']['target']} | "
+                         f"视频 {score_status['video']['current']}/{score_status['video']['target']}")
+        return score_status
+
+    async def pick_targets(self, kind, count):
+        """从内容目录挑选未学习的条目，目录过期或不够时先刷新"""
+        targets = self.catalog.pick(kind, count)
+        if len(targets) >= count and self.catalog.is_fresh(kind):
+            return targets
+
+        harvested = await self.harvest(kind, CATALOG_REFRESH_LIMIT)
+        if harvested:
+            self.catalog.update(kind, harvested)
+        return self.catalog.pick(kind, count)
+
+    async def _probe_selectors(self, page, name, candidates):
+        """一次检查所有候选选择器（上次命中的优先），返回第一个存在的选择器并记入选择器缓存"""
+        ordered = self.selectors.ordered(name, candidates)
+        index = await page.wait_for("(function() {%s%s var r = probeSelectors(%s); return r ? r.index + 1 : 0; })()"
+                                    % (JS_QUERY_ALL, JS_PROBE_SELECTORS, json.dumps(ordered)))
+        selector = ordered[index - 1]
+        self.selectors.remember(name, selector)
+        return selector
+
+    async def harvest(self, kind, count):
+        """在新标签页中打开列表页，一次取出条目地址（只保留DOM中有链接的条目）"""
+        page = await self.new_page()
+        try:
+            if kind == 'article':
+                await page.goto(HOME_URL, ARTICLE_LIST_SELECTOR)
+                selectors = [ARTICLE_LIST_SELECTOR]
+            else:
+                await page.goto(VIDEO_CHANNEL_URL)
+                selectors = [await self._probe_selectors(page, 'video_list', VIDEO_LIST_SELECTORS)]
+
+            items = await page.call(LIST_ITEMS_SCRIPT, selectors[0]['type'], selectors[0]['value'])
+            targets = [{'index': item['index'], 'title': item['title'], 'url': item['url'],
+                        'duration': item.get('duration')}
+                       for item in (items or [])[:count] if item['url']]
+            self.logger.info(f"列表页取出 {len(targets)} 个{'文章' if kind == 'article' else '视频'}")
+            return targets
+        except Exception as e:
+            self.logger.error(f"读取列表页失败: {e}")
+            return []
+        finally:
+            await self.close_page(page)
+
+    async def dwell(self, page, kind, seconds):
+        """
+        在标签页停留 seconds 秒
+
+        AUTONOMOUS_DWELL 时滚动和继续播放由页面内脚本完成，只按 DWELL_HEARTBEAT 检查一次；
+        否则文章每2-5秒滚动一次，视频每15-30秒检查是否暂停
+        """
+        end_time = time.time() + seconds
+        if AUTONOMOUS_DWELL:
+            await page.call(AUTO_DWELL_SCRIPT, kind, seconds)
+        while time.time() < end_time:
+            if AUTONOMOUS_DWELL:
+                await asyncio.sleep(max(0, min(DWELL_HEARTBEAT, end_time - time.time())))
+                remaining = end_time - time.time()
+                if remaining > 1 and await page.call(DWELL_STATUS_SCRIPT) is None:
+                    await page.call(AUTO_DWELL_SCRIPT, kind, remaining)
+            elif kind == 'article':
+                await page.scroll_by(random.randint(100, 500))
+                await asyncio.sleep(max(0, min(random.uniform(2, 5), end_time - time.time())))
+            else:
+                await asyncio.sleep(max(0, min(random.uniform(15, 30), end_time - time.time())))
+                await page.evaluate("(function() { var v = document.querySelector('video'); "
+                                    "if (v && v.paused && !v.ended) v.play(); })()")
+
+    async def read_article(self, target):
+        """在独立标签页中打开一篇文章并随机滚动阅读"""
+        page = await self.new_page()
+        try:
+            await page.goto(target['url'])
+            read_time = article_read_seconds()
+            self.logger.info(f"正在阅读《{target['title']}》，阅读时间：{read_time}秒")
+
+            await self.dwell(page, 'article', read_time)
+            self.catalog.mark_consumed(target)
+            return True
+        finally:
+            await self.close_page(page)
+
+    async def _start_video_playback(self, page, target):
+        """找到播放器，静音播放并返回计划观看时间"""
+        try:
+            await self._probe_selectors(page, 'video_player',
+                                        [{"type": "xpath", "value": xpath} for xpath in VIDEO_PLAYER_XPATHS])
+        except asyncio.TimeoutError:
+            self.logger.info("未找到视频播放器，使用默认观看时间")
+            return default_video_watch_seconds()
+
+        await page.evaluate("(function() { var v = document.querySelector('video'); "
+                            "if (v) { v.muted = true; v.play(); } })()")
+        duration = None
+        try:
+            duration = await page.wait_for("(function() { var v = document.querySelector('video'); "
+                                           "return v && v.duration > 0 && isFinite(v.duration) ? v.duration : 0; })()",
+                                           timeout=10)
+        except asyncio.TimeoutError:
+            pass
+
+        if duration and not math.isnan(duration):
+            self.catalog.set_duration(target['url'], round(duration, 1))
+            return min(int(duration) + VIDEO_END_MARGIN + random.randint(0, 5), video_watch_limit())
+        self.logger.info("无法获取视频时长，使用默认观看时间")
+        return default_video_watch_seconds()
+
+    async def watch_video(self, target):
+        """在独立标签页中打开一个视频并观看，暂停时继续播放"""
+        page = await self.new_page()
+        try:
+            await page.goto(target['url'])
+            watch_time = await self._start_video_playback(page, target)
+            self.logger.info(f"正在观看《{target['title']}》，观看时间：{watch_time}秒")
+
+            await self.dwell(page, 'video', watch_time)
+            self.catalog.mark_consumed(target)
+            return True
+        finally:
+            await self.close_page(page)
+
+    async def _run_item(self, semaphore, label, action, target):
+        async with semaphore:
+            try:
+                return await action(target)
+            except Exception as e:
+                self.logger.warning(f"{label}《{target['title']}》失败: {e}")
+                return False
+
+    async def learn(self, num_articles, num_videos):
+        """文章和视频同时进行，最多同时打开 concurrent_tabs 个标签页"""
+        semaphore = asyncio.Semaphore(self.concurrent_tabs)
+        articles = await self.pick_targets('article', num_articles) if num_articles > 0 else []
+        videos = []
+        if num_videos > 0:
+            await self.pick_targets('video', num_videos)
+            candidates = self.catalog.pick('video', len(self.catalog.items('video')))
+            videos = [item for item, _ in plan_videos(candidates, num_videos * VIDEO_POINTS_PER_VIDEO)['videos']]
+
+        self.logger.info(f"同时学习 {len(articles)} 篇文章和 {len(videos)} 个视频（{self.concurrent_tabs}个标签页）")
+        await asyncio.gather(
+            *[self._run_item(semaphore, "观看视频", self.watch_video, target) for target in videos],
+            *[self._run_item(semaphore, "阅读文章", self.read_article, target) for target in articles],
+        )
+
+    async def run_automatic_learning(self):
+        """全自动学习，直到文章和视频积分都达到目标或连续几轮没有进展"""
+        self.logger.info("===== 开始全自动学习 =====")
+        score_status = await self.check_score()
+        last_progress = None
+        idle_rounds = 0
+        while True:
+            article_remaining = max(0, score_status['article']['target'] - score_status['article']['current'])
+            video_remaining = max(0, score_status['video']['target'] - score_status['video']['current'])
+            if article_remaining <= 0 and video_remaining <= 0:
+                self.logger.info("✅ 所有学习任务已完成！")
+                return True
+
+            progress = (score_status['article']['current'], score_status['video']['current'])
+            idle_rounds = idle_rounds + 1 if progress == last_progress else 0
+            last_progress = progress
+            if idle_rounds >= MAX_IDLE_ROUNDS:
+                self.logger.warning(f"连续{idle_rounds}轮积分没有变化，停止全自动学习")
+                return False
+
+            await self.learn(min(6, article_remaining), min(6, video_remaining))
+            score_status = await self.check_score()
+
+
+async def run_account_async(profile, browser=None):
+    """
+    为一个账号运行全自动学习，返回与 run_account 相同格式的汇总（另有 js_heap_mb：运行期间本账号标签页JS堆的峰值）
+
+    参数：
+        browser: 共用的浏览器，传入时在其中新建独立上下文，否则单独启动一个浏览器
+    """
+    start_time = time.time()
+    summary = {'name': profile['name'], 'success': False, 'score': None, 'elapsed': 0, 'error': None,
+               'js_heap_mb': None}
+    own_browser = browser is None
+    context_id = None
+    sampler = None
+    try:
+        if own_browser:
+            browser = await EdgeBrowser.launch(profile.get('user_data_dir'))
+        else:
+            context_id = await browser.new_context()
+        assistant = AsyncAssistant(browser, account=profile['name'], browser_context_id=context_id)
+        await assistant.start()
+        sampler = asyncio.create_task(assistant.sample_js_heap())
+        if not await assistant.login():
+            summary['error'] = "登录失败或超时"
+        else:
+            summary['success'] = await assistant.run_automatic_learning()
+            summary['score'] = await assistant.check_score()
+        await assistant.js_heap_usage()
+        summary['js_heap_mb'] = assistant.peak_js_heap_mb
+    except Exception as e:
+        summary['error'] = str(e)
+    finally:
+        if sampler:
+            sampler.cancel()
+        if own_browser and browser:
+            await browser.close()
+        elif context_id:
+            await browser.close_context(context_id)
+        summary['elapsed'] = time.time() - start_time
+    return summary
+
+
+def default_context_count():
+    """根据可用内存估算共用浏览器中可以同时运行的账号数量"""
+    memory_mb = _available_memory_mb()
+    if memory_mb is None:
+        return 4
+    return max(1, memory_mb // MEMORY_PER_CONTEXT_MB)
+
+
+async def run_accounts_async(profiles, shared=None, max_contexts=None):
+    """
+    在同一个事件循环中同时运行多个账号
+
+    参数：
+        shared: 是否共用一个浏览器进程（每个账号一个上下文），默认使用 SHARED_BROWSER
+        max_contexts: 最多同时运行的账号数量（共用浏览器时为上下文数量，否则为浏览器数量），
+                      默认根据可用内存估算
+    """
+    if shared is None:
+        shared = SHARED_BROWSER
+
+    if max_contexts is None:
+        max_contexts = default_context_count() if shared else default_worker_count()
+    max_contexts = max(1, min(max_contexts, len(profiles)))
+
+    browser = None
+    if shared:
+        print(f"共 {len(profiles)} 个账号，共用一个浏览器，同时运行 {max_contexts} 个上下文")
+        browser = await EdgeBrowser.launch()
+    else:
+        print(f"共 {len(profiles)} 个账号，每个账号一个浏览器，同时运行 {max_contexts} 个浏览器")
+    semaphore = asyncio.Semaphore(max_contexts)
+
+    async def run(profile):
+        async with semaphore:
+            return await run_account_async(profile, browser)
+
+    try:
+        summaries = await asyncio.gather(*[run(profile) for profile in profiles])
+    finally:
+        if browser:
+            await browser.close()
+
+    for summary in summaries:
+        status = "✅ 完成" if summary['success'] else "❌ 失败"
+        memory_text = f" | JS堆峰值 {summary['js_heap_mb']:.0f}MB" if summary['js_heap_mb'] is not None else ""
+        error_text = f" | 错误: {summary['error']}" if summary['error'] else ""
+        print(f"{summary['name']}: {status} | 耗时 {summary['elapsed'] / 60:.1f}分钟{memory_text}{error_text}")
+    return summaries
+
+
+def main():
+    """主函数：不带参数时运行默认账号，传入账号配置文件时同时运行多个账号"""
+    if websockets is None:
+        print("缺少必要依赖: websockets")
+        print("请安装所需包: pip install websockets")
+        return
+
+    if len(sys.argv) > 1:
+        profiles = load_account_profiles(sys.argv[1])
+    else:
+        profiles = [{'name': 'default', 'user_data_dir': None}]
+    asyncio.run(run_accounts_async(profiles))
+
+
+if __name__ == "__main__":
+    main()
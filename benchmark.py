@@ -0,0 +1,196 @@
+"""
+端到端性能测试：在本地模拟网站(mock_site.py)上运行助手，统计每个场景的耗时、WebDriver命令数量和浏览器内存
+
+场景：
+    score  查询积分 check_score
+    read   阅读文章 read_articles
+    watch  观看视频 watch_videos
+    auto   全自动学习 run_automatic_learning
+
+用法: python benchmark.py [--scenarios score,read,watch,auto] [--accounts 2] [--time-scale 0.05] [--json result.json]
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import main_ai
+import mock_site
+from main_ai import XueXiQiangGuoAssistant, apply_config
+from mock_site import MockSite, mock_config
+
+BENCHMARK_SCENARIOS = ['score', 'read', 'watch', 'auto']  # 默认运行的场景
+
+
+class CommandCounter:
+    """统计一个driver发出的WebDriver命令，所有命令都经过 driver.execute"""
+
+    def __init__(self, driver):
+        self.counts = Counter()
+        original_execute = driver.execute
+
+        def execute(command, params=None):
+            self.counts[command] += 1
+            return original_execute(command, params)
+
+        driver.execute = execute
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def reset(self):
+        self.counts.clear()
+
+
+def browser_memory_mb(driver):
+    """浏览器进程树(驱动进程及其所有子进程)的常驻内存(MB)，没有 psutil 时返回None"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes if p.is_running()) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def prepare_environment(site, time_scale, work_dir):
+    """让助手指向模拟网站，并把会话、目录缓存等数据文件放到临时目录"""
+    config = mock_config(site.base_url, time_scale, data_dir=work_dir)
+    config['USE_DRIVER_POOL'] = False
+    apply_config(config)
+
+
+def reset_progress(site):
+    """清空模拟网站的积分和本地学习记录，每个场景从零开始（保留登录会话）"""
+    site.state.reset()
+    for directory in (main_ai.HISTORY_DIR, main_ai.CHECKPOINT_DIR):
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def site_score(assistant):
+    """模拟网站上的积分，格式为 文章/视频"""
+    score = assistant.check_score(verbose=False)
+    return f"{score['article']['current']}/{score['video']['current']}"
+
+
+def run_scenario(scenario, account, args):
+    """为一个账号运行一个场景，返回统计结果"""
+    result = {'scenario': scenario, 'account': account, 'error': None}
+    assistant = XueXiQiangGuoAssistant(account=account, interactive=False)
+    start_time = time.time()
+    try:
+        if not assistant.initialize_driver():
+            raise RuntimeError("浏览器初始化失败")
+        counter = CommandCounter(assistant.driver)
+        result['startup'] = time.time() - start_time
+
+        login_start = time.time()
+        if not assistant.login():
+            raise RuntimeError("登录失败")
+        result['login'] = time.time() - login_start
+        result['login_commands'] = counter.total
+        counter.reset()
+
+        task_start = time.time()
+        if scenario == 'score':
+            assistant.check_score(verbose=False)
+        elif scenario == 'read':
+            assistant.read_articles(args.articles)
+        elif scenario == 'watch':
+            assistant.watch_videos(args.videos)
+        elif scenario == 'auto':
+            assistant.run_automatic_learning()
+        result['elapsed'] = time.time() - task_start
+        result['commands'] = counter.total
+        result['top_commands'] = dict(counter.counts.most_common(5))
+        result['memory_mb'] = browser_memory_mb(assistant.driver)
+        result['score'] = site_score(assistant)
+        # 最后一个页面在离开或关闭浏览器时才统计，这里先记入
+        assistant._record_load_savings()
+        result['load_saved'] = sum(assistant.load_savings)
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        assistant.quit_driver()
+        result['total'] = time.time() - start_time
+    return result
+
+
+def run_benchmark(args):
+    """依次运行每个场景，每个场景中多个账号同时运行"""
+    work_dir = tempfile.mkdtemp(prefix="xuexi_benchmark_")
+    site = MockSite(time_scale=args.time_scale).start()
+    mock_site.MOCK_DAILY_TARGET = args.daily_target
+    prepare_environment(site, args.time_scale, work_dir)
+    results = []
+    try:
+        for scenario in args.scenarios:
+            reset_progress(site)
+            scenario_results = [None] * args.accounts
+
+            def worker(index):
+                scenario_results[index] = run_scenario(scenario, f"bench{index + 1}", args)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.accounts)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            results.extend(scenario_results)
+    finally:
+        site.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def print_report(results, time_scale):
+    print("\n" + "=" * 100)
+    print(f"性能测试结果（时间缩放 {time_scale}，耗时为实际秒数）")
+    print("=" * 100)
+    print(f"{'场景':<8}{'账号':<10}{'启动':>8}{'登录':>8}{'任务':>10}{'命令数':>8}{'内存MB':>10}{'积分(文/视)':>14}"
+          f"{'提前加载':>10}  主要命令")
+    for result in results:
+        if result['error']:
+            print(f"{result['scenario']:<8}{result['account']:<10}失败: {result['error']}")
+            continue
+        memory = f"{result['memory_mb']:.0f}" if result['memory_mb'] is not None else "-"
+        top = ', '.join(f"{name}×{count}" for name, count in result['top_commands'].items())
+        print(f"{result['scenario']:<8}{result['account']:<10}{result['startup']:>8.1f}{result['login']:>8.1f}"
+              f"{result['elapsed']:>10.1f}{result['commands']:>8}{memory:>10}{result['score']:>14}"
+              f"{result['load_saved']:>10.1f}  {top}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在本地模拟网站上测试助手的耗时、WebDriver命令数量和内存")
+    parser.add_argument('--scenarios', default=','.join(BENCHMARK_SCENARIOS),
+                        help="要运行的场景，逗号分隔: " + ','.join(BENCHMARK_SCENARIOS))
+    parser.add_argument('--accounts', type=int, default=1, help="同时运行的账号数量")
+    parser.add_argument('--articles', type=int, default=6, help="read 场景阅读的文章数量")
+    parser.add_argument('--videos', type=int, default=3, help="watch 场景观看的视频数量")
+    parser.add_argument('--daily-target', type=int, default=mock_site.MOCK_DAILY_TARGET,
+                        help="模拟网站每天的文章和视频积分上限（auto 场景的工作量）")
+    parser.add_argument('--time-scale', type=float, default=mock_site.MOCK_TIME_SCALE, help="时间缩放比例")
+    parser.add_argument('--json', help="把结果另存为JSON文件")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in args.scenarios if name not in BENCHMARK_SCENARIOS]
+    if unknown:
+        parser.error(f"未知的场景: {', '.join(unknown)}")
+
+    results = run_benchmark(args)
+    print_report(results, args.time_scale)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if all(not result['error'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,323 @@
+"""
+常驻的Edge驱动池
+
+守护进程预先启动若干个浏览器并定期检查它们是否可用，任务通过本地socket借用和归还浏览器，
+省去每次运行时查找驱动、启动浏览器和首次加载首页的时间。
+
+启动守护进程: python driver_pool.py [浏览器数量]
+XueXiQiangGuoAssistant.initialize_driver() 会优先从驱动池借用浏览器，守护进程未运行时照常自行启动。
+多账号运行时每个账号使用独立的用户数据目录，不从驱动池借用浏览器。
+
+协议：每个连接发送一行JSON请求，返回一行JSON响应
+    {"cmd": "acquire", "timeout": 0}  -> {"ok": true, "id": 1, "executor_url": "...", "session_id": "..."}
+                                        没有空闲浏览器时最多等待 timeout 秒（默认 POOL_ACQUIRE_TIMEOUT），仍没有时 ok 为 false
+    {"cmd": "release", "id": 1}       -> {"ok": true}
+    {"cmd": "status"}                 -> {"ok": true, "drivers": [...]}
+"""
+import json
+import logging
+import socket
+import socketserver
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.edge.remote_connection import EdgeRemoteConnection
+
+from main_ai import (DRIVER_POOL_HOST, DRIVER_POOL_PORT, HOME_URL, LOGIN_URL, POINTS_URL,
+                     XueXiQiangGuoAssistant, default_worker_count)
+
+POOL_HEALTH_INTERVAL = 60  # 空闲浏览器健康检查间隔(秒)
+POOL_LEASE_TIMEOUT = 4 * 3600  # 借出超过这个时间没有归还的浏览器会被回收(秒)
+POOL_CONNECT_TIMEOUT = 2  # 连接驱动池的超时时间(秒)
+POOL_ACQUIRE_TIMEOUT = 120  # 请求没有指定时，没有空闲浏览器最多等待多久(秒)
+POOL_CLIENT_WAIT = 0  # 助手借用浏览器时等待空闲浏览器的时间(秒)，0 表示没有空闲的就立即自己启动浏览器
+# 归还浏览器时需要清空localStorage的站点
+RESET_ORIGINS = sorted({"{0.scheme}://{0.netloc}".format(urlsplit(url)) for url in (HOME_URL, LOGIN_URL, POINTS_URL)})
+
+
+class AttachedEdgeDriver(webdriver.Remote):
+    """附加到驱动池中已经存在的浏览器会话，不新建会话"""
+
+    def __init__(self, executor_url, session_id):
+        self._attach_session_id = session_id
+        super().__init__(command_executor=EdgeRemoteConnection(executor_url, keep_alive=True), options=Options())
+
+    def start_session(self, *args, **kwargs):
+        self.session_id = self._attach_session_id
+        self.caps = {}
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def quit(self):
+        # 浏览器属于驱动池，只能归还不能关闭
+        pass
+
+
+class DriverPool:
+    """维护一组预先启动的浏览器，借出时做一次健康检查，归还时清理会话"""
+
+    def __init__(self, size=None, logger=None):
+        self.size = size or default_worker_count()
+        self.logger = logger or logging.getLogger('DriverPool')
+        self.entries = {}
+        self._next_id = 0
+        self._lock = threading.Condition()
+        self._stopped = threading.Event()
+        self._fill_lock = threading.Lock()
+
+    def _launch(self):
+        """启动一个浏览器并预先加载首页，失败时返回None"""
+        assistant = XueXiQiangGuoAssistant(interactive=False)
+        # 驱动池自己的浏览器不能再向驱动池借用
+        assistant._use_pool = False
+        if not assistant.initialize_driver():
+            return None
+        try:
+            assistant.driver.get(HOME_URL)
+        except Exception as e:
+            self.logger.debug(f"预加载首页失败: {e}")
+        return assistant.driver
+
+    def _is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver):
+        """
+        清理上一个任务留下的状态：cookie、缓存的存储和注入脚本
+
+        注入脚本属于标签页，所以新开一个标签页后关闭其余所有标签页
+        """
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in RESET_ORIGINS:
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'local_storage'})
+        old_handles = driver.window_handles
+        driver.switch_to.new_window('tab')
+        fresh_handle = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_handle)
+
+    def fill(self):
+        """补足浏览器数量，已有线程在补充时直接返回"""
+        if not self._fill_lock.acquire(blocking=False):
+            return
+        try:
+            while len(self.entries) < self.size and not self._stopped.is_set():
+                driver = self._launch()
+                if not driver:
+                    self.logger.error("启动浏览器失败，稍后重试")
+                    return
+                with self._lock:
+                    self._next_id += 1
+                    self.entries[self._next_id] = {'driver': driver, 'busy': False, 'leased_at': None}
+                    self._lock.notify_all()
+                self.logger.info(f"浏览器 #{self._next_id} 已就绪（{len(self.entries)}/{self.size}）")
+        finally:
+            self._fill_lock.release()
+
+    def _recycle(self, entry_id):
+        """关闭并移除一个浏览器，由健康检查线程补足"""
+        with self._lock:
+            entry = self.entries.pop(entry_id, None)
+        if entry:
+            self.logger.warning(f"回收浏览器 #{entry_id}")
+            self._quit(entry['driver'])
+
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        """借出一个通过健康检查的空闲浏览器，超时返回None"""
+        end_time = time.time() + timeout
+        while True:
+            with self._lock:
+                idle = [entry_id for entry_id, entry in self.entries.items() if not entry['busy']]
+                if not idle:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        return None
+                    self._lock.wait(min(5, remaining))
+                    continue
+                entry_id = idle[0]
+                entry = self.entries[entry_id]
+                entry['busy'] = True
+                entry['leased_at'] = time.time()
+
+            if self._is_healthy(entry['driver']):
+                return entry_id, entry['driver']
+            self._recycle(entry_id)
+            threading.Thread(target=self.fill, daemon=True).start()
+            if time.time() >= end_time:
+                return None
+
+    def release(self, entry_id):
+        """归还浏览器，清理失败时直接回收"""
+        with self._lock:
+            entry = self.entries.get(entry_id)
+        if not entry:
+            return False
+        try:
+            self._reset(entry['driver'])
+        except Exception as e:
+            self.logger.warning(f"清理浏览器 #{entry_id} 失败: {e}")
+            self._recycle(entry_id)
+            threading.Thread(target=self.fill, daemon=True).start()
+            return True
+        with self._lock:
+            entry['busy'] = False
+            entry['leased_at'] = None
+            self._lock.notify_all()
+        return True
+
+    def check_health(self):
+        """检查所有空闲浏览器，回收崩溃的和借出超时的，然后补足数量"""
+        with self._lock:
+            snapshot = list(self.entries.items())
+        for entry_id, entry in snapshot:
+            if entry['busy']:
+                if time.time() - entry['leased_at'] > POOL_LEASE_TIMEOUT:
+                    self.logger.warning(f"浏览器 #{entry_id} 借出超时")
+                    self._recycle(entry_id)
+                continue
+            with self._lock:
+                if entry['busy']:
+                    continue
+                entry['busy'] = True
+            healthy = self._is_healthy(entry['driver'])
+            with self._lock:
+                entry['busy'] = False
+                self._lock.notify_all()
+            if not healthy:
+                self._recycle(entry_id)
+        self.fill()
+
+    def status(self):
+        with self._lock:
+            return [{'id': entry_id, 'busy': entry['busy'], 'leased_at': entry['leased_at']}
+                    for entry_id, entry in self.entries.items()]
+
+    def health_loop(self):
+        while not self._stopped.wait(POOL_HEALTH_INTERVAL):
+            try:
+                self.check_health()
+            except Exception as e:
+                self.logger.error(f"健康检查出错: {e}")
+
+    def shutdown(self):
+        self._stopped.set()
+        with self._lock:
+            entries = list(self.entries.values())
+            self.entries = {}
+        for entry in entries:
+            self._quit(entry['driver'])
+
+
+class PoolRequestHandler(socketserver.StreamRequestHandler):
+    """处理一行JSON请求"""
+
+    def handle(self):
+        pool = self.server.pool
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            cmd = request.get('cmd')
+            if cmd == 'acquire':
+                leased = pool.acquire(request.get('timeout', POOL_ACQUIRE_TIMEOUT))
+                if leased:
+                    entry_id, driver = leased
+                    response = {'ok': True, 'id': entry_id, 'session_id': driver.session_id,
+                                'executor_url': driver.command_executor._url}
+                else:
+                    response = {'ok': False, 'error': '没有可用的浏览器'}
+            elif cmd == 'release':
+                response = {'ok': pool.release(request.get('id'))}
+            elif cmd == 'status':
+                response = {'ok': True, 'drivers': pool.status()}
+            else:
+                response = {'ok': False, 'error': f'未知命令: {cmd}'}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+
+
+class PoolServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, pool, address=(DRIVER_POOL_HOST, DRIVER_POOL_PORT)):
+        self.pool = pool
+        super().__init__(address, PoolRequestHandler)
+
+
+def _request(payload, timeout=None):
+    """向驱动池发送一个请求，守护进程未运行时返回None"""
+    try:
+        with socket.create_connection((DRIVER_POOL_HOST, DRIVER_POOL_PORT), timeout=POOL_CONNECT_TIMEOUT) as conn:
+            conn.settimeout(timeout or POOL_ACQUIRE_TIMEOUT + 10)
+            conn.sendall((json.dumps(payload) + '\n').encode('utf-8'))
+            data = b''
+            while not data.endswith(b'\n'):
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data.decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def acquire_driver(timeout=POOL_CLIENT_WAIT):
+    """
+    从驱动池借用一个浏览器
+
+    参数：
+        timeout: 没有空闲浏览器时最多等待的秒数，默认不等待
+
+    返回：
+        (租约ID, 附加好的driver)，驱动池不可用或没有空闲浏览器时返回None
+    """
+    response = _request({'cmd': 'acquire', 'timeout': timeout}, timeout=timeout + 10)
+    if not response or not response.get('ok'):
+        return None
+    return response['id'], AttachedEdgeDriver(response['executor_url'], response['session_id'])
+
+
+def release_driver(lease_id):
+    """把浏览器归还给驱动池"""
+    response = _request({'cmd': 'release', 'id': lease_id}, timeout=60)
+    return bool(response and response.get('ok'))
+
+
+def main():
+    """启动驱动池守护进程"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    pool = DriverPool(size)
+    pool.fill()
+    threading.Thread(target=pool.health_loop, daemon=True).start()
+
+    server = PoolServer(pool)
+    print(f"驱动池已启动: {DRIVER_POOL_HOST}:{DRIVER_POOL_PORT}，共 {pool.size} 个浏览器（Ctrl+C 退出）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.shutdown()
+        print("驱动池已关闭")
+
+
+if __name__ == "__main__":
+    main()
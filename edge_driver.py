@@ -0,0 +1,186 @@
+"""
+Edge驱动查找和JSON数据文件读写
+
+只依赖标准库，导入时不修改警告过滤、环境变量等进程级状态，main.py 和 main_ai.py 都可以直接导入
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DRIVER_MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "driver_manifest.json")  # 驱动路径和版本缓存
+# Edge 浏览器的常见安装位置，找不到时再从 PATH 中查找
+EDGE_BINARY_CANDIDATES = [
+    r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+    r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
+    "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+    "/usr/bin/microsoft-edge",
+    "/usr/bin/microsoft-edge-stable",
+    "/opt/microsoft/msedge/msedge",
+]
+# 本地已安装的Edge驱动的常见位置
+EDGE_DRIVER_CANDIDATES = [
+    "msedgedriver",  # 当前目录
+    "/usr/local/bin/msedgedriver",  # Linux
+    "/usr/bin/msedgedriver",  # Linux
+    "C:\\Program Files\\EdgeDriver\\msedgedriver.exe",  # Windows
+    "C:\\Windows\\System32\\msedgedriver.exe",  # Windows
+]
+
+
+def _read_json(path):
+    """读取JSON文件，文件不存在或损坏时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, data):
+    """
+    先写临时文件再替换，避免多个进程或线程同时写入、写到一半退出时文件损坏
+
+    临时文件由 mkstemp 生成唯一的名字，同一进程中的多个线程（例如多账号并发）不会写到同一个临时文件
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def find_edge_binary(binary_path=None):
+    """查找Edge浏览器可执行文件，binary_path 为手动指定的路径，找不到时返回None"""
+    if binary_path:
+        return binary_path
+    for path in EDGE_BINARY_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    for name in ("msedge", "microsoft-edge", "microsoft-edge-stable"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def _version_from_output(args):
+    """运行 `程序 --version` 并取出其中的版本号，失败时返回None"""
+    try:
+        output = subprocess.run(args, capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r"(\d+\.\d+\.\d+\.\d+)", output or '')
+    return match.group(1) if match else None
+
+
+def installed_edge_version(binary_path=None):
+    """只读取本地信息获取已安装的Edge版本，不访问网络，获取不到时返回None"""
+    if sys.platform == 'win32':
+        try:
+            import winreg
+            for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(root, r"Software\Microsoft\Edge\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, "version")[0]
+                except OSError:
+                    continue
+        except ImportError:
+            pass
+        return None
+
+    if sys.platform == 'darwin':
+        import plistlib
+        try:
+            with open("/Applications/Microsoft Edge.app/Contents/Info.plist", 'rb') as f:
+                return plistlib.load(f).get('CFBundleShortVersionString')
+        except (OSError, ValueError):
+            return None
+
+    binary = find_edge_binary(binary_path)
+    return _version_from_output([binary, '--version']) if binary else None
+
+
+def _same_major(version_a, version_b):
+    """驱动和浏览器的主版本号一致即可配合使用"""
+    return bool(version_a and version_b) and version_a.split('.')[0] == version_b.split('.')[0]
+
+
+def resolve_edge_driver(logger=None, manifest_file=None, driver_path=None, binary_path=None):
+    """
+    离线优先地查找与本机Edge匹配的驱动
+
+    依次尝试：手动指定的 driver_path、清单中缓存的驱动、本地常见位置的驱动，
+    只有版本都不匹配时才通过 webdriver_manager 联网下载。结果写入清单供下次直接使用
+
+    参数：
+        driver_path: 手动指定的驱动路径（例如 main_ai.EDGE_DRIVER_PATH），存在时直接使用
+        binary_path: 手动指定的Edge浏览器路径，用于读取浏览器版本
+
+    返回：
+        驱动路径，找不到时返回None
+    """
+    logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+    manifest_file = manifest_file or DRIVER_MANIFEST_FILE
+    if driver_path and os.path.exists(driver_path):
+        return driver_path
+
+    edge_version = installed_edge_version(binary_path)
+    manifest = _read_json(manifest_file) or {}
+
+    cached_path = manifest.get('driver_path')
+    if cached_path and os.path.exists(cached_path):
+        # 浏览器版本未知时相信缓存；浏览器升级后主版本不同才需要重新查找
+        if edge_version is None or _same_major(manifest.get('driver_version'), edge_version):
+            logger.info(f"使用缓存的Edge驱动: {cached_path}")
+            return cached_path
+        logger.info(f"Edge已升级到 {edge_version}，缓存的驱动版本为 {manifest.get('driver_version')}")
+
+    def remember(path, version):
+        try:
+            _write_json_atomic(manifest_file, {'driver_path': os.path.abspath(path), 'driver_version': version,
+                                               'edge_version': edge_version, 'resolved_at': time.time()})
+        except OSError as e:
+            logger.debug(f"写入驱动清单失败: {e}")
+        return path
+
+    local_paths = [path for path in EDGE_DRIVER_CANDIDATES + [shutil.which("msedgedriver")]
+                   if path and os.path.exists(path)]
+    for path in local_paths:
+        version = _version_from_output([path, '--version'])
+        if edge_version is None or _same_major(version, edge_version):
+            logger.info(f"使用Edge驱动: {path}")
+            return remember(path, version)
+
+    # 本地没有匹配的驱动，才联网下载
+    try:
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        path = EdgeChromiumDriverManager(
+            url="https://msedgedriver.microsoft.com/",
+            latest_release_url="https://msedgedriver.microsoft.com/LATEST_RELEASE"
+        ).install()
+        logger.info(f"已下载Edge驱动: {path}")
+        return remember(path, _version_from_output([path, '--version']))
+    except ImportError:
+        logger.warning("webdriver_manager 未安装，无法自动下载驱动")
+    except Exception as e:
+        logger.warning(f"自动下载驱动失败: {e}")
+
+    # 下载失败时退而使用版本不匹配的本地驱动，总比没有好
+    if local_paths:
+        logger.warning(f"使用版本可能不匹配的Edge驱动: {local_paths[0]}")
+        return local_paths[0]
+    return None
@@ -4,24 +4,71 @@ import time
 import os
 import datetime
 import json
-import pickle
 import base64
 from io import BytesIO
 
 from PIL import Image
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+from edge_driver import resolve_edge_driver
 
 # 全局配置
 ARTICLE_READ_TIME = 70  # 阅读文章时间(秒)
 VIDEO_WATCH_TIME = 180  # 观看视频时间(秒)
 WAIT_TIMEOUT = 30  # 等待元素超时时间(秒)
+CONCURRENT_TABS = 3  # 同时打开的文章标签页数量(1为逐篇阅读)
+NETWORK_IDLE_TIME = 0.5  # 页面资源请求数量保持不变多久视为网络空闲(秒)
+
+def navigate(driver, url, ready=None, network_idle=False, timeout=WAIT_TIMEOUT):
+    """
+    打开页面并等待页面真正可用，不使用固定的sleep
+    
+    参数：
+        driver: WebDriver实例
+        url: 要打开的地址
+        ready: 页面就绪条件，可以是 (By, value) 元素定位或接收driver的函数
+        network_idle: 是否额外等待页面资源请求停止增加
+        timeout: 最长等待时间
+    
+    返回：
+        页面就绪用时(秒)
+    """
+    start_time = time.time()
+    driver.get(url)
+
+    wait = WebDriverWait(driver, timeout, poll_frequency=0.2)
+    wait.until(lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete'))
+    if ready is not None:
+        wait.until(ready if callable(ready) else EC.presence_of_element_located(ready))
+    if network_idle:
+        # 资源请求数量在 NETWORK_IDLE_TIME 内不再增加视为网络空闲
+        state = {'count': -1, 'since': time.time()}
+
+        def idle(d):
+            count = d.execute_script("return performance.getEntriesByType('resource').length")
+            if count != state['count']:
+                state['count'] = count
+                state['since'] = time.time()
+                return False
+            return time.time() - state['since'] >= NETWORK_IDLE_TIME
+
+        try:
+            wait.until(idle)
+        except TimeoutException:
+            # 一直有资源在加载时不再等待，停止加载剩余资源后照常使用页面
+            print(f"等待网络空闲超时，停止加载剩余资源: {url}")
+            driver.execute_script("window.stop();")
+
+    elapsed = time.time() - start_time
+    print(f"页面就绪用时{elapsed:.2f}秒: {url}")
+    return elapsed
 
 def extract_login_qrcode(driver, output_path=None):
     """
@@ -42,8 +89,7 @@ def extract_login_qrcode(driver, output_path=None):
         # 确保页面已加载到登录页
         if "login.html" not in driver.current_url:
             print("正在跳转到登录页面...")
-            driver.get("https://pc.xuexi.cn/points/login.html")
-            time.sleep(2)
+            navigate(driver, "https://pc.xuexi.cn/points/login.html", (By.ID, "ddlogin-iframe"))
         
         # 切换到登录iframe
         wait = WebDriverWait(driver, WAIT_TIMEOUT)
@@ -153,15 +199,16 @@ def launch_xuexi_website():
         edge_options.add_argument("--disable-gpu")
         edge_options.add_argument("--window-size=1920,1080")
 
-        # 初始化WebDriver
-        driver = webdriver.Edge(service=Service(EdgeChromiumDriverManager(
-            url="https://msedgedriver.microsoft.com/",
-            latest_release_url="https://msedgedriver.microsoft.com/LATEST_RELEASE")
-            .install()), options=edge_options)
+        # 初始化WebDriver，优先使用本地缓存的驱动，不匹配时才联网下载
+        driver_path = resolve_edge_driver()
+        if not driver_path:
+            print("未找到Edge驱动，请手动安装msedgedriver")
+            return
+        driver = webdriver.Edge(service=Service(driver_path), options=edge_options)
 
         # 打开学习强国登录页面
         print("正在打开学习强国登录页面...")
-        driver.get("https://pc.xuexi.cn/points/login.html")
+        navigate(driver, "https://pc.xuexi.cn/points/login.html", (By.ID, "ddlogin-iframe"))
 
         print("页面已打开，请扫描二维码登录...")
         output_path = extract_login_qrcode(driver)
@@ -187,7 +234,7 @@ def launch_xuexi_website():
             driver.quit()
             print("浏览器已关闭")
 
-def read_articles(driver, num_articles=6, start_index=0):
+def read_articles(driver, num_articles=6, start_index=0, concurrent_tabs=None):
     """
     阅读文章获取积分
     
@@ -195,12 +242,17 @@ def read_articles(driver, num_articles=6, start_index=0):
         driver: WebDriver实例
         num_articles: 要阅读的文章数量
         start_index: 从文章列表的第几篇文章开始阅读
+        concurrent_tabs: 同时打开的文章标签页数量，默认使用 CONCURRENT_TABS
     """
+    if concurrent_tabs is None:
+        concurrent_tabs = CONCURRENT_TABS
+    if concurrent_tabs > 1:
+        return read_articles_concurrently(driver, num_articles, start_index, concurrent_tabs)
+
     try:
         # 跳转到新闻页面
         print("正在跳转到新闻页面...")
-        driver.get("https://www.xuexi.cn")
-        time.sleep(2)
+        navigate(driver, "https://www.xuexi.cn", (By.XPATH, "//div[@class='text-link-item-title']"))
 
         # 等待文章列表加载
         article_links = WebDriverWait(driver, WAIT_TIMEOUT).until(
@@ -249,6 +301,86 @@ def read_articles(driver, num_articles=6, start_index=0):
         print(f"阅读文章时发生错误: {e}")
         return False
 
+def read_articles_concurrently(driver, num_articles=6, start_index=0, concurrent_tabs=CONCURRENT_TABS):
+    """
+    并发阅读文章：同时保持多个文章标签页打开，轮流滚动，每篇单独计时
+    
+    参数：
+        driver: WebDriver实例
+        num_articles: 要阅读的文章数量
+        start_index: 从文章列表的第几篇文章开始阅读
+        concurrent_tabs: 同时打开的文章标签页数量
+    """
+    try:
+        print("正在跳转到新闻页面...")
+        navigate(driver, "https://www.xuexi.cn", (By.XPATH, "//div[@class='text-link-item-title']"))
+
+        article_links = WebDriverWait(driver, WAIT_TIMEOUT).until(
+            EC.presence_of_all_elements_located((By.XPATH, "//div[@class='text-link-item-title']"))
+        )
+
+        read_count = min(len(article_links), num_articles)
+        print(f"找到{len(article_links)}篇文章，计划并发阅读{read_count}篇（{concurrent_tabs}个标签页），从第{start_index+1}篇开始")
+
+        list_handle = driver.current_window_handle
+        pending = [(i + start_index) % len(article_links) for i in range(read_count)]
+        open_tabs = []
+        dwell_report = []
+
+        while pending or open_tabs:
+            # 补开新的文章标签页
+            while pending and len(open_tabs) < concurrent_tabs:
+                actual_index = pending.pop(0)
+                driver.switch_to.window(list_handle)
+                article_links = WebDriverWait(driver, WAIT_TIMEOUT).until(
+                    EC.presence_of_all_elements_located((By.XPATH, "//div[@class='text-link-item-title']"))
+                )
+                known_handles = set(driver.window_handles)
+                article_links[actual_index % len(article_links)].click()
+
+                new_handles = [h for h in driver.window_handles if h not in known_handles]
+                if not new_handles:
+                    print(f"第 {actual_index+1} 篇文章没有在新标签页中打开，跳过")
+                    navigate(driver, "https://www.xuexi.cn", (By.XPATH, "//div[@class='text-link-item-title']"))
+                    continue
+
+                read_time = ARTICLE_READ_TIME + random.randint(-10, 10)
+                open_tabs.append({'handle': new_handles[0], 'index': actual_index,
+                                  'start': time.time(), 'read_time': read_time})
+                print(f"已打开第 {actual_index+1}/{len(article_links)} 篇文章，计划阅读{read_time}秒")
+
+            # 轮流滚动各标签页，到时间的关闭
+            for tab in list(open_tabs):
+                driver.switch_to.window(tab['handle'])
+                dwell = time.time() - tab['start']
+                if dwell >= tab['read_time']:
+                    driver.close()
+                    open_tabs.remove(tab)
+                    dwell_report.append((tab['index'], dwell, tab['read_time']))
+                    print(f"第 {tab['index']+1} 篇文章阅读完成，停留{dwell:.1f}秒（计划{tab['read_time']}秒）")
+                    continue
+                scroll_height = random.randint(100, 500)
+                driver.execute_script(f"window.scrollBy(0, {scroll_height});")
+
+            driver.switch_to.window(list_handle)
+            if open_tabs:
+                next_due = min(tab['start'] + tab['read_time'] for tab in open_tabs) - time.time()
+                time.sleep(max(0.5, min(random.uniform(2, 5), next_due)))
+
+        print("各标签页停留时间:")
+        for index, dwell, read_time in dwell_report:
+            print(f"  第 {index+1} 篇: {dwell:.1f}秒 / 计划{read_time}秒")
+
+        print("文章阅读完成！")
+        return True
+    except Exception as e:
+        print(f"并发阅读文章时发生错误: {e}")
+        try:
+            driver.switch_to.window(driver.window_handles[0])
+        except:
+            pass
+        return False
+
 def watch_videos(driver, num_videos=6, start_index=0):
     """
     观看视频获取积分
@@ -260,8 +392,8 @@ def watch_videos(driver, num_videos=6, start_index=0):
     """
     try:
         #print("正在跳转到视频页面...")
-        driver.get("https://www.xuexi.cn/4426aa87b0b64ac671c96379a3a8bd26/db086044562a57b441c24f2af1c8e101.html")
-        time.sleep(3)
+        navigate(driver, "https://www.xuexi.cn/4426aa87b0b64ac671c96379a3a8bd26/db086044562a57b441c24f2af1c8e101.html",
+                 network_idle=True)
 
         # 等待视频列表加载 - 调整选择器以匹配视频列表项
         print("等待视频列表加载...")
@@ -431,13 +563,8 @@ def check_score(driver, verbose=False):
     try:
         # 跳转到积分页面
         print("正在检查积分状态...")
-        driver.get("https://pc.xuexi.cn/points/my-points.html")
-        time.sleep(3)
-
-        # 等待积分数据加载
-        WebDriverWait(driver, WAIT_TIMEOUT).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "my-points-content"))
-        )
+        # 等待积分卡片加载
+        navigate(driver, "https://pc.xuexi.cn/points/my-points.html", (By.CLASS_NAME, "my-points-card"))
 
         # 提取各项积分详情
         article_points = {'current': 0, 'target': 12}
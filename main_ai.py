@@ -4,10 +4,10 @@ import time
 import os
 import datetime
 import json
-import pickle
 import base64
 import math
 import warnings
+from urllib.parse import urlsplit
 from io import BytesIO
 import sys
 
@@ -21,71 +21,887 @@ os.environ['WDM_PRINT_FIRST_LINE'] = 'False'
 from PIL import Image
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.edge.service import Service
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+import edge_driver
+from edge_driver import _read_json, _write_json_atomic
+
 # 全局配置
-ARTICLE_READ_TIME = 70  # 阅读文章时间(秒)
-VIDEO_WATCH_TIME = 180  # 观看视频时间(秒)
+ARTICLE_READ_TIME = 70.0  # 阅读文章时间(秒)
+ARTICLE_READ_JITTER = 10  # 阅读时间的随机浮动范围(秒)
+VIDEO_WATCH_TIME = 180.0  # 观看视频时间(秒)，视频时长未知时使用
+VIDEO_WATCH_JITTER = 15  # 视频时长未知时观看时间的随机浮动范围(秒)
+VIDEO_MAX_WATCH = 300.0  # 单个视频最长观看时间(秒)
+VIDEO_END_MARGIN = 5  # 视频播放结束后多停留的时间(秒)
+VIDEO_POINTS_PER_VIDEO = 1  # 每看完一个视频获得的视听积分
+VIDEO_LOAD_OVERHEAD = 5  # 估算每打开一个视频页面的加载用时(秒)
 WAIT_TIMEOUT = 30  # 等待元素超时时间(秒)
+PAGE_LOAD_STRATEGY = "eager"  # 页面加载策略：normal 等所有资源加载完，eager 只等DOM就绪，none 不等待
+PAGE_LOAD_TIMEOUT = 60  # navigate() 之外 driver.get 的超时时间(秒)，navigate() 按页面预算设置
+# 各类页面就绪的时间预算(秒)，超出预算仍有资源在加载时停止加载；未列出的页面使用 WAIT_TIMEOUT
+PAGE_BUDGETS = {'home': 20, 'login': 20, 'points': 20, 'video_list': 20, 'article': 15, 'video': 15}
 EDGE_DRIVER_PATH = None  # 可以手动指定Edge驱动路径
+EDGE_BINARY_PATH = None  # 可以手动指定Edge浏览器路径
+# 驱动路径缓存、Edge和驱动的常见安装位置见 edge_driver.py
+CONCURRENT_TABS = 3  # 同时打开的文章标签页数量(1为逐篇阅读)
+INTERLEAVE_TASKS = True  # 全自动学习时视频与文章交替进行
+SITE_DOMAIN = "xuexi.cn"  # 网站域名，当前页面不在该域名下时需要先打开首页才能带上cookie
+HOME_URL = "https://www.xuexi.cn"  # 学习强国首页(文章列表)
+LOGIN_URL = "https://pc.xuexi.cn/points/login.html"  # 登录页
+POINTS_URL = "https://pc.xuexi.cn/points/my-points.html"  # 我的积分页
+SCORE_API_URL = "https://pc-proxy-api.xuexi.cn/api/score/days/listScoreProgress?sence=score&deviceType=2"  # 积分接口
+SCORE_API_TIMEOUT = 10  # 请求积分接口的超时时间(秒)
+VIDEO_CHANNEL_URL = "https://www.xuexi.cn/4426aa87b0b64ac671c96379a3a8bd26/db086044562a57b441c24f2af1c8e101.html"
+ARTICLE_LIST_XPATH = "//div[@class='text-link-item-title']"  # 首页文章列表项
+ARTICLE_LIST_SELECTOR = {"type": "xpath", "value": ARTICLE_LIST_XPATH}
+ITEM_RETRIES = 1  # 单篇文章或单个视频失败后的重试次数
+# 视频列表页可能的列表项选择器，按顺序尝试
+VIDEO_LIST_SELECTORS = [
+    {"type": "xpath", "value": "//div[contains(@class, 'thePic')][@data-link-target]"},
+    {"type": "xpath", "value": "//div[contains(@class, 'textWrapper')][@data-link-target]"},
+    {"type": "xpath", "value": "//div[contains(@class, 'grid-cell')]//div[contains(@class, 'innerPic')]"},
+    {"type": "css", "value": ".grid-gr .grid-cell"}
+]
+# 视频页可能的播放器选择器，按顺序尝试
+VIDEO_PLAYER_XPATHS = ["//video", "//div[contains(@class,'outter')]//video", "//div[@id='ji-player']"]
+# 登录iframe中二维码图片可能的选择器，按顺序尝试
+LOGIN_QRCODE_XPATHS = [
+    '//*[@id="app"]/div/div[1]/div/div[1]/div[1]/img',
+    '//img[contains(@src, "base64")]',
+    '//div[contains(@class, "qrcode")]//img'
+]
+# 各类页面默认的就绪条件（候选选择器，任意一个出现即就绪），navigate() 没有传入 ready 时使用
+PAGE_READY = {
+    'article': [{"type": "xpath", "value": "//p[normalize-space()]"}],  # 出现正文段落
+    'video': [{"type": "xpath", "value": xpath} for xpath in VIDEO_PLAYER_XPATHS],  # 出现视频播放器
+}
+SELECTOR_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "selector_cache.json")  # 每个页面上次命中的选择器
+NETWORK_IDLE_TIME = 0.5  # 页面资源请求数量保持不变多久视为网络空闲(秒)
+
+# 页面内按 {"type", "value"} 选择器查找元素的公共函数，供下面的批量脚本使用
+JS_QUERY_ALL = """
+function queryAll(type, value) {
+    if (type === 'xpath') {
+        var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(value));
+}
+"""
+
+# 在页面内一次检查所有候选选择器，返回第一个有匹配的 {index, count, element}，都没有时返回null
+JS_PROBE_SELECTORS = """
+function probeSelectors(candidates) {
+    for (var i = 0; i < candidates.length; i++) {
+        var nodes = queryAll(candidates[i].type, candidates[i].value);
+        if (nodes.length) return {index: i, count: nodes.length, element: nodes[0]};
+    }
+    return null;
+}
+"""
+PROBE_SELECTORS_SCRIPT = JS_QUERY_ALL + JS_PROBE_SELECTORS + "return probeSelectors(arguments[0]);"
+
+# 一次调用取出列表中所有条目的标题、链接和 data-link-target
+LIST_ITEMS_SCRIPT = JS_QUERY_ALL + """
+return queryAll(arguments[0], arguments[1]).map(function(el, index) {
+    var link = el.closest('a[href]') || el.querySelector('a[href]');
+    var targetEl = el.closest('[data-link-target]') || el.querySelector('[data-link-target]');
+    // 视频卡片上显示的时长，例如 03:25 或 1:02:10
+    var cell = el.closest('.grid-cell') || el;
+    var match = (cell.innerText || '').match(/(\d{1,2}):(\d{2})(?::(\d{2}))?/);
+    var duration = null;
+    if (match) {
+        duration = match[3] !== undefined
+            ? parseInt(match[1]) * 3600 + parseInt(match[2]) * 60 + parseInt(match[3])
+            : parseInt(match[1]) * 60 + parseInt(match[2]);
+    }
+    return {
+        index: index,
+        title: (el.innerText || el.textContent || '').trim(),
+        url: link ? link.href : (el.getAttribute('data-href') || el.getAttribute('data-link') || ''),
+        target: targetEl ? targetEl.getAttribute('data-link-target') : '',
+        duration: duration
+    };
+});
+"""
+
+# 一次调用完成列表项的定位和点击，返回列表长度(找不到时为0)
+CLICK_LIST_ITEM_SCRIPT = JS_QUERY_ALL + """
+var nodes = queryAll(arguments[0], arguments[1]);
+if (!nodes.length) return 0;
+var el = nodes[arguments[2] % nodes.length];
+el.scrollIntoView({block: 'center'});
+el.click();
+return nodes.length;
+"""
+
+# 一次调用取出所有积分卡片的标题和进度
+SCORE_CARDS_SCRIPT = """
+return Array.prototype.map.call(document.querySelectorAll('.my-points-card'), function(card) {
+    var title = card.querySelector('.my-points-card-title');
+    var text = card.querySelector('.my-points-card-text');
+    return [title ? title.innerText.trim() : '', text ? text.innerText.trim() : ''];
+});
+"""
+
+# 尽量把播放器切换到最低清晰度，返回选中的清晰度名称(找不到时为null)
+VIDEO_LOW_QUALITY_SCRIPT = """
+var options = document.querySelectorAll(
+    '[class*=quality] li, [class*=definition] li, [class*=clarity] li, [class*=quality] [data-value]');
+var preferred = [/流畅/, /低清/, /标清/, /360/, /480/];
+for (var i = 0; i < preferred.length; i++) {
+    for (var j = 0; j < options.length; j++) {
+        var text = (options[j].innerText || options[j].textContent || '').trim();
+        if (preferred[i].test(text)) {
+            options[j].click();
+            return text;
+        }
+    }
+}
+return null;
+"""
+
+# 用页面自身的cookie请求积分接口，返回接口JSON(失败时为null)
+SCORE_FETCH_SCRIPT = """
+var done = arguments[arguments.length - 1];
+fetch(arguments[0], {credentials: 'include'})
+    .then(function(response) { return response.ok ? response.json() : null; })
+    .then(function(data) { done(data); })
+    .catch(function() { done(null); });
+"""
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")  # 多账号浏览器数据目录
+MEMORY_PER_BROWSER_MB = 600  # 每个浏览器实例预估占用内存(MB)，用于限制并发数量
+SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions")  # 登录会话保存目录
+SESSION_MAX_AGE_DAYS = 7  # 保存的登录会话最长使用天数
+TOKEN_COOKIE_KEYS = ['token', 'access_token', 'auth', 'session', 'login']  # 登录token的cookie名称关键字
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content_catalog.json")  # 内容目录缓存
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history")  # 每个账号的学习记录目录
+CATALOG_TTL = 6 * 3600  # 内容目录有效期(秒)
+CATALOG_REFRESH_LIMIT = 40  # 刷新目录时从列表页最多取出的条目数量
+HISTORY_KEEP_DAYS = 30  # 学习记录保留天数
+MAX_IDLE_ROUNDS = 3  # 全自动学习连续多少轮积分没有变化后停止
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints")  # 学习进度检查点目录
+ACCOUNT_RETRIES = 1  # 多账号运行时，中途崩溃的账号重新运行的次数
+DWELL_CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dwell_calibration.json")  # 停留时间校准结果
+DWELL_SAFETY_MARGIN = 1.2  # 使用校准结果时乘以的安全系数
+DWELL_CALIBRATION_MAX_AGE_DAYS = 14  # 校准结果的有效天数，过期后恢复默认停留时间
+CALIBRATION_RANGES = {'article': (10, 80), 'video': (10, 300)}  # 校准时搜索的停留时间范围(秒)，上限应确定能得分
+CALIBRATION_PRECISION = 5.0  # 校准精度(秒)
+CALIBRATION_MAX_PROBES = 6  # 每种内容最多用多少个条目做校准
+CALIBRATION_SCORE_WAIT = 15  # 停留结束后等待积分更新的最长时间(秒)
+
+# 命令行运行的退出码，供定时任务判断结果
+EXIT_OK = 0  # 学习任务全部完成
+EXIT_INCOMPLETE = 1  # 运行结束但任务没有全部完成（多账号时为部分账号失败）
+EXIT_LOGIN_FAILED = 3  # 登录失败或等待扫码超时
+EXIT_BROWSER_FAILED = 4  # 缺少依赖、找不到驱动或浏览器启动失败
+EXIT_CONFIG_ERROR = 5  # 配置文件或账号文件无效
+LOGIN_TIMEOUT = 300  # 等待扫码登录的超时时间(秒)
+LOGIN_EVENT_TIMEOUT = 30  # 单次等待登录事件的最长时间(秒)
+LIGHT_MODE = True  # 轻量模式：不加载图片、字体、统计和推荐等与积分无关的资源，视频选择最低清晰度
+# 轻量模式下拦截的请求地址（CDP Network.setBlockedURLs 通配符）
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*hm.baidu.com*", "*cnzz.com*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*arms-retcode*", "*log.aliyuncs.com*", "*/recommend/*",
+]
+PAGE_WEIGHT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "page_weights.json")  # 每类页面的平均传输量
+USE_DRIVER_POOL = True  # 驱动池守护进程(driver_pool.py)运行时优先借用其中的浏览器（不用于有独立用户数据目录的账号）
+DRIVER_POOL_HOST = "127.0.0.1"  # 驱动池监听地址
+DRIVER_POOL_PORT = 47315  # 驱动池监听端口
+AUTONOMOUS_DWELL = True  # 停留期间由页面内脚本自行滚动和继续播放，Python只在心跳时检查
+DWELL_HEARTBEAT = 30  # 页面内停留脚本的心跳检查间隔(秒)
+VIDEO_STALL_TIMEOUT = 60  # 视频播放进度停滞多久后放弃当前视频(秒)
+PREFETCH_NEXT = True  # 逐个阅读或观看时，在当前条目停留期间用后台标签页预先加载下一个条目
+
+# 在登录页中等待登录相关事件：页面跳转、URL变化、cookie变化或登录iframe发来的消息
+# arguments[0] 为本轮最长等待毫秒数，到时返回 'timeout'，应小于调用方的脚本超时时间；
+# 每轮结束时清除定时器和监听，上一轮没有正常结束时由下一轮先结束它
+LOGIN_WATCH_SCRIPT = """
+var timeoutMs = arguments[0];
+var done = arguments[arguments.length - 1];
+if (window.__xuexiLoginWatch) window.__xuexiLoginWatch('replaced');
+var startCookie = document.cookie;
+var finished = false;
+var timer = null;
+var deadline = null;
+function onNavigation() { finish('navigation'); }
+function onMessage(e) { if (e.data) finish('message'); }
+function finish(reason) {
+    if (finished) return;
+    finished = true;
+    clearInterval(timer);
+    clearTimeout(deadline);
+    window.removeEventListener('pagehide', onNavigation);
+    window.removeEventListener('beforeunload', onNavigation);
+    window.removeEventListener('message', onMessage);
+    if (window.__xuexiLoginWatch === finish) window.__xuexiLoginWatch = null;
+    done(reason);
+}
+window.__xuexiLoginWatch = finish;
+window.addEventListener('pagehide', onNavigation);
+window.addEventListener('beforeunload', onNavigation);
+window.addEventListener('message', onMessage);
+timer = setInterval(function() {
+    if (window.location.href.indexOf('login.html') === -1) finish('url');
+    else if (document.cookie !== startCookie) finish('cookie');
+}, 200);
+deadline = setTimeout(function() { finish('timeout'); }, timeoutMs);
+"""
+
+# 恢复会话时在每个新文档加载前执行，写入对应域名保存的localStorage（不覆盖已有的值）
+# 使用时用 {origin: {key: value}} 的JSON替换 %s
+LOCAL_STORAGE_RESTORE_SCRIPT = """
+(function() {
+    var items = %s[window.location.origin];
+    if (!items) return;
+    try {
+        for (var key in items) {
+            if (localStorage.getItem(key) === null) localStorage.setItem(key, items[key]);
+        }
+    } catch (e) {}
+})();
+"""
+
+# 页面内的停留脚本：文章每2-5秒随机滚动；视频每15-30秒滚动一次(结束前30秒内不滚动)并在暂停时继续播放
+# 到时间后停止，视频滚回播放器位置。参数：内容类型('article'/'video')，停留秒数
+AUTO_DWELL_SCRIPT = """
+var kind = arguments[0];
+var old = window.__xuexiDwell;
+if (old) clearTimeout(old.timer);
+var state = window.__xuexiDwell = {kind: kind, until: Date.now() + arguments[1] * 1000,
+                                   scrolls: 0, resumes: 0, done: false, timer: null};
+function rand(min, max) { return min + Math.random() * (max - min); }
+function step() {
+    var remaining = state.until - Date.now();
+    var video = document.querySelector('video');
+    if (remaining <= 0) {
+        state.done = true;
+        if (kind === 'video' && video) video.scrollIntoView({block: 'center'});
+        return;
+    }
+    if (kind === 'article') {
+        window.scrollBy(0, Math.round(rand(100, 500)));
+        state.scrolls++;
+    } else {
+        if (remaining > 30000) {
+            var height = Math.round(rand(100, 400));
+            window.scrollBy(0, height);
+            state.scrolls++;
+            if (Math.random() > 0.5) {
+                setTimeout(function() { window.scrollBy(0, -Math.round(rand(50, height))); }, rand(2000, 5000));
+            }
+        }
+        if (video && video.paused && !video.ended) {
+            video.play();
+            state.resumes++;
+        }
+    }
+    var interval = kind === 'article' ? rand(2000, 5000) : rand(15000, 30000);
+    state.timer = setTimeout(step, Math.min(interval, remaining));
+}
+step();
+"""
+
+# 在视频元素上安装事件监听：loadedmetadata/pause/ended/stalled 放入事件队列，timeupdate 累计实际播放秒数
+# 返回已知的视频时长，还未加载元数据时返回null
+VIDEO_MONITOR_SCRIPT = """
+var video = arguments[0];
+var state = window.__xuexiVideo;
+if (!state || state.video !== video) {
+    state = window.__xuexiVideo = {video: video, events: [], played: 0, lastTime: video.currentTime, waiter: null};
+    var push = function(type) {
+        state.events.push({type: type, time: video.currentTime});
+        if (state.waiter) state.waiter();
+    };
+    ['loadedmetadata', 'pause', 'ended', 'stalled'].forEach(function(type) {
+        video.addEventListener(type, function() { push(type); });
+    });
+    video.addEventListener('timeupdate', function() {
+        // 拖动进度条造成的时间变化不计入播放时长
+        var delta = video.currentTime - state.lastTime;
+        if (delta > 0 && delta < 2) state.played += delta;
+        state.lastTime = video.currentTime;
+    });
+    video.addEventListener('seeked', function() { state.lastTime = video.currentTime; });
+}
+return video.readyState >= 1 && isFinite(video.duration) ? video.duration : null;
+"""
+
+# 等待视频事件(execute_async_script)：队列中有事件时立即返回，否则最多等待 arguments[0] 毫秒
+# 返回取出的事件和播放状态；页面中没有安装监听，或播放器换成了新的 <video> 元素（旧元素已移除或不再是页面中
+# 第一个视频）时返回null，由调用方重新安装监听
+VIDEO_EVENTS_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var state = window.__xuexiVideo;
+if (!state || !state.video.isConnected) { done(null); return; }
+var first = document.querySelector('video');
+if (state.video.tagName === 'VIDEO' && first && first !== state.video) { done(null); return; }
+var timer = null;
+function finish() {
+    clearTimeout(timer);
+    state.waiter = null;
+    var video = state.video;
+    done({events: state.events.splice(0), played: state.played, current: video.currentTime,
+          duration: isFinite(video.duration) ? video.duration : null, paused: video.paused, ended: video.ended});
+}
+if (state.events.length || arguments[0] <= 0) { finish(); return; }
+state.waiter = finish;
+timer = setTimeout(finish, arguments[0]);
+"""
+
+# 继续播放已安装监听的视频
+VIDEO_RESUME_SCRIPT = """
+var state = window.__xuexiVideo;
+if (state && state.video.paused && !state.video.ended) state.video.play();
+"""
+
+# 读取页面的导航计时：navigate() 判断页面就绪的时间和 load 事件结束的时间(秒，从导航开始计)
+NAVIGATION_TIMING_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav || !window.__xuexiReadyAt) return null;
+return {ready: window.__xuexiReadyAt / 1000, load: nav.loadEventEnd > 0 ? nav.loadEventEnd / 1000 : null,
+        now: performance.now() / 1000};
+"""
+
+# 读取页面内停留脚本的状态，页面刷新或跳转后脚本丢失时返回null
+DWELL_STATUS_SCRIPT = """
+var s = window.__xuexiDwell;
+if (!s) return null;
+return {remaining: Math.max(0, (s.until - Date.now()) / 1000), scrolls: s.scrolls, resumes: s.resumes, done: s.done};
+"""
+
+
+class SessionStore:
+    """按账号保存和恢复登录会话（cookie 和 localStorage），避免每次运行都扫码"""
+
+    # CDP Network.setCookies 接受的cookie字段
+    COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+    def __init__(self, directory=None, logger=None):
+        self.directory = directory or SESSIONS_DIR
+        self.logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+
+    def _path(self, account):
+        return os.path.join(self.directory, f"{account or 'default'}.json")
+
+    def _cdp(self, driver, cmd, params=None):
+        """执行CDP命令，驱动不支持时返回None"""
+        if not hasattr(driver, 'execute_cdp_cmd'):
+            return None
+        return driver.execute_cdp_cmd(cmd, params or {})
+
+    def load(self, account):
+        """读取已保存的会话，不存在或损坏时返回None"""
+        return _read_json(self._path(account))
+
+    def is_expired(self, session):
+        """只根据本地保存的cookie过期时间判断，不发起任何网络请求"""
+        now = time.time()
+        if now - session.get('saved_at', 0) > SESSION_MAX_AGE_DAYS * 86400:
+            return True
+
+        token_cookies = [c for c in session.get('cookies', [])
+                         if any(key in c.get('name', '').lower() for key in TOKEN_COOKIE_KEYS)]
+        if not token_cookies:
+            return True
+        # 会话cookie(expires<=0)没有过期时间，交给登录检查验证
+        return all(0 < c.get('expires', -1) < now for c in token_cookies)
+
+    def save(self, driver, account):
+        """保存当前浏览器的全部cookie和当前页面的localStorage"""
+        try:
+            result = self._cdp(driver, 'Network.getAllCookies')
+            if result is not None:
+                cookies = result.get('cookies', [])
+            else:
+                cookies = driver.get_cookies()
+
+            origin = driver.execute_script("return window.location.origin")
+            items = driver.execute_script("""
+                var items = {};
+                for (var i = 0; i < localStorage.length; i++) {
+                    var key = localStorage.key(i);
+                    items[key] = localStorage.getItem(key);
+                }
+                return items;
+            """)
+            self.write(account, cookies, {origin: items or {}} if origin and origin.startswith('http') else {})
+            return True
+        except Exception as e:
+            self.logger.warning(f"保存登录会话失败: {e}")
+            return False
+
+    def write(self, account, cookies, local_storage=None):
+        """
+        写入会话文件
+
+        参数：
+            cookies: CDP格式的cookie列表
+            local_storage: {origin: {key: value}}，与已保存的内容合并
+        """
+        session = self.load(account) or {}
+        merged_storage = session.get('local_storage', {})
+        merged_storage.update(local_storage or {})
+
+        _write_json_atomic(self._path(account), {
+            'saved_at': time.time(), 'cookies': [self._normalize_cookie(c) for c in cookies],
+            'local_storage': merged_storage})
+        self.logger.info(f"登录会话已保存（{len(cookies)} 个cookie）")
+
+    def restore(self, driver, account):
+        """
+        在第一次页面跳转之前把保存的会话注入新浏览器
+
+        返回：
+            是否恢复了未过期的会话
+        """
+        session = self.load(account)
+        if not session:
+            return False
+        if self.is_expired(session):
+            self.logger.info("已保存的登录会话已过期，需要重新扫码")
+            self.clear(account)
+            return False
+
+        try:
+            if self._cdp(driver, 'Network.setCookies', {'cookies': session['cookies']}) is None:
+                # 驱动不支持CDP时，只能先打开域名再逐个写入cookie
+                driver.get(HOME_URL)
+                for cookie in session['cookies']:
+                    cookie = dict(cookie)
+                    expires = cookie.pop('expires', -1)
+                    if expires > 0:
+                        cookie['expiry'] = int(expires)
+                    try:
+                        driver.add_cookie(cookie)
+                    except Exception:
+                        pass
+
+            local_storage = session.get('local_storage', {})
+            if local_storage:
+                # 每个新文档加载前写入对应域名的localStorage（不覆盖已有的值）
+                self._cdp(driver, 'Page.addScriptToEvaluateOnNewDocument',
+                          {'source': LOCAL_STORAGE_RESTORE_SCRIPT % json.dumps(local_storage)})
+
+            self.logger.info(f"已恢复保存的登录会话（{len(session['cookies'])} 个cookie）")
+            return True
+        except Exception as e:
+            self.logger.warning(f"恢复登录会话失败: {e}")
+            return False
+
+    def clear(self, account):
+        """删除保存的会话"""
+        try:
+            os.remove(self._path(account))
+        except OSError:
+            pass
+
+    def _normalize_cookie(self, cookie):
+        """统一 Selenium 和 CDP 两种cookie格式"""
+        cookie = dict(cookie)
+        if 'expiry' in cookie:
+            cookie['expires'] = cookie.pop('expiry')
+        if cookie.get('session'):
+            cookie['expires'] = -1
+        return {key: cookie[key] for key in self.COOKIE_FIELDS if key in cookie}
+
+
+def is_site_url(url):
+    """地址是否属于 SITE_DOMAIN（包括子域名）"""
+    host = urlsplit(url or '').hostname or ''
+    return host == SITE_DOMAIN or host.endswith('.' + SITE_DOMAIN)
+
+
+class ContentCatalog:
+    """
+    文章和视频的内容目录缓存，以及每个账号已学习过的条目记录
+
+    目录在 CATALOG_TTL 内有效，有效期内直接从目录挑选未学习的条目，不再打开列表页
+    """
+
+    def __init__(self, account=None, catalog_file=None, history_dir=None, logger=None):
+        self.catalog_file = catalog_file or CATALOG_FILE
+        self.history_file = os.path.join(history_dir or HISTORY_DIR, f"{account or 'default'}.json")
+        self.logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+        self.catalog = self._load(self.catalog_file)
+        self.history = self._load(self.history_file)
+        self._prune_history()
+
+    def _load(self, path):
+        return _read_json(path) or {}
+
+    def _save(self, path, data):
+        _write_json_atomic(path, data)
+
+    def _prune_history(self):
+        """只保留 HISTORY_KEEP_DAYS 天内的学习记录"""
+        cutoff = time.time() - HISTORY_KEEP_DAYS * 86400
+        self.history = {url: record for url, record in self.history.items()
+                        if record.get('consumed_at', 0) >= cutoff}
+
+    def is_fresh(self, kind):
+        """目录中该类型的条目是否还在有效期内"""
+        fetched_at = self.catalog.get(kind, {}).get('fetched_at', 0)
+        return time.time() - fetched_at < CATALOG_TTL
+
+    def items(self, kind):
+        """目录中该类型的条目，只保留当前网站(SITE_DOMAIN)下的地址，忽略其他环境(如本地模拟网站)写入的条目"""
+        return [item for item in self.catalog.get(kind, {}).get('items', []) if is_site_url(item['url'])]
+
+    def update(self, kind, targets):
+        """用刚从列表页取出的条目刷新目录，保留已知的视频时长"""
+        now = time.time()
+        known = {item['url']: item for item in self.items(kind)}
+        items = []
+        for target in targets:
+            item = {
+                'index': target['index'],
+                'url': target['url'],
+                'title': target['title'],
+                'type': kind,
+                'duration': known.get(target['url'], {}).get('duration') or target.get('duration'),
+                'fetched_at': now,
+            }
+            items.append(item)
+
+        # 重新读取文件，合并其他进程写入的内容后再保存
+        self.catalog = self._load(self.catalog_file)
+        self.catalog[kind] = {'fetched_at': now, 'items': items}
+        self._save(self.catalog_file, self.catalog)
+        self.logger.info(f"内容目录已刷新：{len(items)} 个{'文章' if kind == 'article' else '视频'}")
+
+    def pick(self, kind, count, start_index=0):
+        """按目录顺序挑选本账号还没有学习过的条目"""
+        unconsumed = [item for item in self.items(kind) if item['url'] not in self.history]
+        return unconsumed[start_index:start_index + count]
+
+    def is_consumed(self, url):
+        return url in self.history
+
+    def mark_consumed(self, target):
+        """记录本账号已经学习过的条目"""
+        self.history[target['url']] = {'type': target.get('type'), 'title': target.get('title'),
+                                       'consumed_at': time.time()}
+        self._save(self.history_file, self.history)
+
+    def set_duration(self, url, duration):
+        """记录视频时长，供后续按时长挑选视频"""
+        known = next((item for item in self.items('video') if item['url'] == url), None)
+        if known is None or known.get('duration') == duration:
+            return
+        known['duration'] = duration
+
+        # 重新读取文件，只更新这一条，避免覆盖其他进程刷新的目录或记录的时长
+        catalog = self._load(self.catalog_file)
+        for item in catalog.get('video', {}).get('items', []):
+            if item.get('url') == url:
+                item['duration'] = duration
+                self._save(self.catalog_file, catalog)
+                return
+
+
+class SelectorRegistry:
+    """
+    记录每个页面上次命中的选择器
+
+    页面改版后候选选择器中只有后面几个有效，记住命中的那个，下次运行时放在最前面
+    """
+
+    def __init__(self, cache_file=None, logger=None):
+        self.cache_file = cache_file or SELECTOR_CACHE_FILE
+        self.logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+        self.winners = self._load()
+
+    def _load(self):
+        return _read_json(self.cache_file) or {}
+
+    def ordered(self, page, candidates):
+        """返回候选选择器列表，上次命中的选择器排在最前面"""
+        winner = self.winners.get(page)
+        if winner not in candidates:
+            return list(candidates)
+        return [winner] + [selector for selector in candidates if selector != winner]
+
+    def remember(self, page, selector):
+        """记录页面命中的选择器，与上次相同时不写文件"""
+        if self.winners.get(page) == selector:
+            return
+        # 合并其他进程写入的结果
+        self.winners = self._load()
+        self.winners[page] = selector
+        try:
+            _write_json_atomic(self.cache_file, self.winners)
+        except OSError as e:
+            self.logger.warning(f"保存选择器缓存失败: {e}")
+
+
+class CheckpointJournal:
+    """
+    每个账号每天一个的学习检查点日志（每行一个JSON事件），每个条目完成后追加一行
+
+    程序中途崩溃后重新运行时，从日志中恢复已完成的条目和最后的积分，只需重做被中断的条目
+    """
+
+    def __init__(self, account=None, directory=None, logger=None, day=None):
+        day = day or datetime.date.today().isoformat()
+        self.path = os.path.join(directory or CHECKPOINT_DIR, f"{account or 'default'}_{day}.jsonl")
+        self.logger = logger or logging.getLogger('XueXiQiangGuoAssistant')
+        self.entries = self._load()
+
+    def _load(self):
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # 崩溃时可能只写了半行
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    def record(self, event, **fields):
+        """追加一条事件并立即写入磁盘"""
+        entry = dict(fields, event=event, time=time.time())
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            self.logger.warning(f"写入检查点失败: {e}")
+        self.entries.append(entry)
+
+    def item_started(self, kind, target):
+        self.record('item_start', kind=kind, url=target['url'], title=target.get('title'))
+
+    def item_finished(self, kind, target, dwell, success=True, played=None):
+        """played 为视频实际播放的秒数"""
+        fields = {'played': round(played, 1)} if played is not None else {}
+        self.record('item', kind=kind, url=target['url'], title=target.get('title'),
+                    dwell=round(dwell, 1), status='done' if success else 'failed', **fields)
+
+    def completed_items(self):
+        return [entry for entry in self.entries if entry['event'] == 'item' and entry.get('status') == 'done']
+
+    def last_score(self):
+        scores = [entry['score'] for entry in self.entries if entry['event'] == 'score']
+        return scores[-1] if scores else None
+
+    def interrupted_item(self):
+        """最后一个开始了但没有结束的条目，没有时返回None"""
+        finished = {entry['url'] for entry in self.entries if entry['event'] == 'item'}
+        for entry in reversed(self.entries):
+            if entry['event'] == 'item_start' and entry['url'] not in finished:
+                return entry
+        return None
+
+    def has_unfinished_run(self):
+        """最近一次全自动学习是否在结束前中断"""
+        for entry in reversed(self.entries):
+            if entry['event'] == 'finish':
+                return False
+            if entry['event'] == 'start':
+                return True
+        return False
+
+    def is_completed(self):
+        """今天的学习任务是否已经全部完成"""
+        return any(entry['event'] == 'finish' and entry.get('completed') for entry in self.entries)
+
+
+def find_edge_binary():
+    """查找Edge浏览器可执行文件（EDGE_BINARY_PATH 优先），找不到时返回None"""
+    return edge_driver.find_edge_binary(EDGE_BINARY_PATH)
+
+
+def score_items_from_api(data):
+    """把积分接口返回的JSON转换成 [(标题, "当前/目标")] 列表"""
+    payload = (data or {}).get('data') or {}
+    tasks = payload.get('taskProgress') or payload.get('taskProgressList') or []
+    score_items = []
+    for task in tasks:
+        title = task.get('title') or task.get('ruleTitle') or ''
+        current = task.get('currentScore')
+        target = task.get('dayMaxScore', task.get('maxScore'))
+        if title and current is not None and target is not None:
+            score_items.append((title, f"{current}/{target}"))
+    return score_items
+
+
+def parse_score_items(score_items):
+    """
+    把 [(标题, "当前/目标")] 解析成文章和视频的积分状态
+
+    返回：
+        (积分状态字典, 解析失败的 [(类型, 进度文字, 错误)] 列表)
+    """
+    article_points = {'current': 0, 'target': 12}
+    video_points = {'current': 0, 'target': 12}
+    failures = []
+
+    for title, progress in score_items:
+        # 提取文章和视频的积分情况
+        if "选读文章" in title or "阅读文章" in title or "我要选读文章" in title:
+            points, name = article_points, "文章"
+        elif ("视听学习" in title or "视频" in title) and (
+                "时长" in title or "分钟" in title or "我要" in title):
+            points, name = video_points, "视频"
+        else:
+            continue
+
+        try:
+            current, target = progress.split("/")
+            # 移除非数字字符再转换
+            current_clean = ''.join(filter(str.isdigit, current))
+            target_clean = ''.join(filter(str.isdigit, target))
+
+            points['current'] = int(current_clean)
+            points['target'] = int(target_clean)
+        except Exception as e:
+            failures.append((name, progress, e))
+
+    return {'article': article_points, 'video': video_points}, failures
+
+
+def load_dwell_calibration(path=None):
+    """读取停留时间校准结果 {类型: {'threshold', 'calibrated_at', 'probes'}}"""
+    return _read_json(path or DWELL_CALIBRATION_FILE) or {}
+
+
+def calibrated_dwell_value(result):
+    """校准结果乘以安全系数后的停留时间"""
+    return int(math.ceil(result['threshold'] * DWELL_SAFETY_MARGIN))
+
+
+def calibrated_dwell(kind):
+    """校准得到的停留时间（已乘安全系数），没有校准或已过期时返回None"""
+    result = load_dwell_calibration().get(kind)
+    if not result or time.time() - result.get('calibrated_at', 0) > DWELL_CALIBRATION_MAX_AGE_DAYS * 86400:
+        return None
+    return calibrated_dwell_value(result)
+
+
+def article_read_seconds():
+    """一篇文章的阅读时间：有校准结果时用校准值加少量随机，否则用 ARTICLE_READ_TIME"""
+    calibrated = calibrated_dwell('article')
+    if calibrated:
+        return calibrated + random.randint(0, 5)
+    return ARTICLE_READ_TIME + random.randint(-ARTICLE_READ_JITTER, ARTICLE_READ_JITTER)
+
+
+def video_watch_limit():
+    """单个视频的最长观看时间：VIDEO_MAX_WATCH 与校准值中较小的一个"""
+    calibrated = calibrated_dwell('video')
+    return min(VIDEO_MAX_WATCH, calibrated) if calibrated else VIDEO_MAX_WATCH
+
+
+def default_video_watch_seconds():
+    """视频时长未知时的观看时间：VIDEO_WATCH_TIME 加随机抖动，不超过 video_watch_limit()"""
+    return min(VIDEO_WATCH_TIME + random.randint(-VIDEO_WATCH_JITTER, VIDEO_WATCH_JITTER), video_watch_limit())
+
+
+def estimate_watch_seconds(item):
+    """估算一个视频需要观看的秒数：看到结束，最长 video_watch_limit() 秒，时长未知时按 VIDEO_WATCH_TIME"""
+    limit = video_watch_limit()
+    duration = item.get('duration')
+    if not duration:
+        return min(VIDEO_WATCH_TIME, limit)
+    return min(int(duration) + VIDEO_END_MARGIN, limit)
+
+
+def plan_videos(candidates, points_needed):
+    """
+    按视频时长挑选要观看的视频
+
+    每看完一个视频获得 VIDEO_POINTS_PER_VIDEO 分，因此页面加载次数固定为所需视频数量，
+    在此前提下挑选观看时间最短的视频，时长已知的视频优先
+
+    参数：
+        candidates: 内容目录中未学习的视频条目
+        points_needed: 还需要的视听积分
+
+    返回：
+        {'videos': [(条目, 估算观看秒数)], 'planned_seconds': 估算总用时(含页面加载), 'page_loads': 页面加载次数}
+    """
+    count = math.ceil(max(0, points_needed) / VIDEO_POINTS_PER_VIDEO)
+    ranked = sorted(candidates, key=lambda item: (estimate_watch_seconds(item), not item.get('duration')))
+    videos = [(item, estimate_watch_seconds(item)) for item in ranked[:count]]
+    return {
+        'videos': videos,
+        'planned_seconds': sum(seconds for _, seconds in videos) + len(videos) * VIDEO_LOAD_OVERHEAD,
+        'page_loads': len(videos),
+    }
 
 
 class XueXiQiangGuoAssistant:
     """学习强国助手类"""
     
-    def __init__(self):
+    def __init__(self, account=None, user_data_dir=None, interactive=True):
+        """
+        参数：
+            account: 账号名称，多账号运行时用于区分日志和数据文件
+            user_data_dir: 浏览器用户数据目录，每个账号使用独立目录
+            interactive: 是否允许通过 input() 询问用户，后台运行时应为False
+        """
         self.driver = None
+        self._work_handle = None  # 按地址打开文章和视频时复用的标签页
+        self._prefetched = {}  # 预先加载的条目地址 -> 后台标签页句柄
+        self._network_stats = {}  # 标签页句柄 -> 性能日志中累计的传输字节数和拦截请求数
+        self.load_savings = []  # 每次跳转不等完整加载提前开始使用页面的秒数
+        self.account = account
+        self.user_data_dir = user_data_dir
+        self.interactive = interactive
+        self._use_pool = USE_DRIVER_POOL
+        self._pool_lease = None  # 从驱动池借用的浏览器的租约ID
         self.logger = self._setup_logger()
+        self.session_store = SessionStore(logger=self.logger)
+        self.catalog = ContentCatalog(account=self.account, logger=self.logger)
+        self.journal = CheckpointJournal(account=self.account, logger=self.logger)
+        self.selectors = SelectorRegistry(logger=self.logger)
     
     def _setup_logger(self):
         """设置日志记录器"""
-        logger = logging.getLogger('XueXiQiangGuoAssistant')
+        name = 'XueXiQiangGuoAssistant'
+        if self.account:
+            name = f"{name}.{self.account}"
+        logger = logging.getLogger(name)
         logger.setLevel(logging.INFO)
+        logger.propagate = False
         
         if not logger.handlers:
             handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+            prefix = f"[{self.account}] " if self.account else ""
+            formatter = logging.Formatter(f'%(asctime)s - %(levelname)s - {prefix}%(message)s')
             handler.setFormatter(formatter)
             logger.addHandler(handler)
         
         return logger
     
     def _get_edge_driver_path(self):
-        """获取Edge驱动路径，支持离线模式"""
+        """获取Edge驱动路径，离线优先，只在本地驱动与浏览器版本不匹配时联网"""
         try:
-            # 尝试自动下载（在线模式）
-            try:
-                from webdriver_manager.microsoft import EdgeChromiumDriverManager
-                return EdgeChromiumDriverManager(
-                    url="https://msedgedriver.microsoft.com/",
-                    latest_release_url="https://msedgedriver.microsoft.com/LATEST_RELEASE"
-                ).install()
-            except ImportError:
-                self.logger.warning("webdriver_manager 未安装，尝试使用系统路径中的驱动")
-            except Exception as e:
-                self.logger.warning(f"自动下载驱动失败: {e}")
-            
-            # 离线模式：检查常见路径
-            possible_paths = [
-                EDGE_DRIVER_PATH,
-                "msedgedriver",  # 当前目录
-                "/usr/local/bin/msedgedriver",  # Linux
-                "/usr/bin/msedgedriver",  # Linux
-                "C:\\Program Files\\EdgeDriver\\msedgedriver.exe",  # Windows
-                "C:\\Windows\\System32\\msedgedriver.exe",  # Windows
-            ]
-            
-            for path in possible_paths:
-                if path and os.path.exists(path):
-                    self.logger.info(f"使用Edge驱动: {path}")
-                    return path
-            
+            path = edge_driver.resolve_edge_driver(self.logger, driver_path=EDGE_DRIVER_PATH,
+                                                   binary_path=EDGE_BINARY_PATH)
+            if path:
+                return path
+
             # 如果都没找到，提示用户手动指定
             self.logger.error("未找到Edge驱动，请手动安装并指定路径")
+            if not self.interactive:
+                raise Exception("未找到有效的Edge驱动路径")
             manual_path = input("请输入Edge驱动的完整路径（或按Enter退出）: ").strip()
             if manual_path and os.path.exists(manual_path):
                 return manual_path
@@ -96,8 +912,36 @@ class XueXiQiangGuoAssistant:
             self.logger.error(f"获取Edge驱动路径失败: {e}")
             return None
     
+    def _acquire_pooled_driver(self):
+        """
+        驱动池守护进程运行时借用一个预先启动的浏览器，没有空闲浏览器时不排队等待，由调用方立即自己启动
+
+        借用的浏览器没有独立的用户数据目录，登录状态由 SessionStore 恢复；
+        指定了 user_data_dir 的账号（多账号运行）不使用驱动池，见 initialize_driver()
+        """
+        try:
+            from driver_pool import acquire_driver
+            leased = acquire_driver()
+        except Exception as e:
+            self.logger.debug(f"驱动池不可用: {e}")
+            return False
+        if not leased:
+            return False
+
+        self._pool_lease, self.driver = leased
+        self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        self.driver.implicitly_wait(0)
+        self._apply_light_mode()
+        self.logger.info(f"使用驱动池中的浏览器 #{self._pool_lease}")
+        return True
+
     def initialize_driver(self):
         """初始化WebDriver，支持离线模式"""
+        # 驱动池中的浏览器在账号之间共用，只清理cookie和部分localStorage，
+        # 需要独立用户数据目录的账号总是自己启动浏览器
+        if self._use_pool and not self.user_data_dir and self._acquire_pooled_driver():
+            return True
+
         try:
             # 设置Edge选项
             edge_options = Options()
@@ -117,7 +961,9 @@ class XueXiQiangGuoAssistant:
             edge_options.add_argument("--disable-dev-shm-usage")
             edge_options.add_argument("--disable-extensions")
             edge_options.add_argument("--disable-plugins")
-            edge_options.add_argument("--disable-images")
+            if LIGHT_MODE:
+                # Edge 不支持 --disable-images，只能通过 blink 设置关闭图片
+                edge_options.add_argument("--blink-settings=imagesEnabled=false")
             edge_options.add_argument("--disable-javascript-harmony-shipping")
             
             # 窗口和显示选项
@@ -130,10 +976,22 @@ class XueXiQiangGuoAssistant:
             edge_options.add_argument("--silent")
             edge_options.add_experimental_option('excludeSwitches', ['enable-logging'])
             edge_options.add_experimental_option('useAutomationExtension', False)
+
+            # 性能日志只记录Network事件，用于统计每个页面的实际传输量和拦截的请求数
+            edge_options.set_capability('ms:loggingPrefs', {'performance': 'ALL'})
+            edge_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
             
             # 可选：取消注释以下行以启用无头模式
             edge_options.add_argument("--headless")
+
+            # 每个账号使用独立的用户数据目录，互不影响
+            if self.user_data_dir:
+                os.makedirs(self.user_data_dir, exist_ok=True)
+                edge_options.add_argument(f"--user-data-dir={os.path.abspath(self.user_data_dir)}")
             
+            # 不等待统计、推荐等第三方资源加载完，页面是否可用由 navigate() 按页面判断
+            edge_options.page_load_strategy = PAGE_LOAD_STRATEGY
+
             # 获取驱动路径
             driver_path = self._get_edge_driver_path()
             if not driver_path:
@@ -144,9 +1002,10 @@ class XueXiQiangGuoAssistant:
             service = Service(executable_path=driver_path)
             self.driver = webdriver.Edge(service=service, options=edge_options)
             
-            # 设置页面加载超时
-            self.driver.set_page_load_timeout(60)
-            self.driver.implicitly_wait(10)
+            # 设置页面加载超时；只使用显式等待，不设置隐式等待以免两者叠加
+            self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            self.driver.implicitly_wait(0)
+            self._apply_light_mode()
             
             self.logger.info("浏览器初始化成功")
             return True
@@ -155,6 +1014,71 @@ class XueXiQiangGuoAssistant:
             self.logger.error(f"初始化WebDriver时发生错误: {e}")
             return False
     
+    def _apply_light_mode(self):
+        """轻量模式下为当前标签页拦截无关资源，拦截设置只对当前标签页有效，每个新标签页都要调用"""
+        if not LIGHT_MODE or not hasattr(self.driver, 'execute_cdp_cmd'):
+            return
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            self.logger.debug(f"设置资源拦截失败: {e}")
+
+    def _collect_network_log(self):
+        """
+        取出浏览器性能日志中的Network事件，按标签页累计实际传输的字节数(loadingFinished 的
+        encodedDataLength，包括跨域资源)和被轻量模式拦截的请求数(带 blockedReason 的 loadingFailed)
+        """
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])
+            method = message['message'].get('method')
+            params = message['message'].get('params', {})
+            if method == 'Network.loadingFinished':
+                stats = self._tab_network_stats(message.get('webview'))
+                stats['bytes'] += params.get('encodedDataLength', 0)
+                stats['requests'] += 1
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                self._tab_network_stats(message.get('webview'))['blocked'] += 1
+
+    def _reset_network_stats(self):
+        """当前标签页要打开新页面，丢弃之前页面的网络统计"""
+        try:
+            self._collect_network_log()
+            self._network_stats.pop(self.driver.current_window_handle, None)
+        except Exception as e:
+            self.logger.debug(f"读取性能日志失败: {e}")
+
+    def _tab_network_stats(self, handle):
+        return self._network_stats.setdefault(handle, {'bytes': 0, 'requests': 0, 'blocked': 0})
+
+    def _record_page_weight(self, kind):
+        """统计当前标签页实际传输的字节数和被拦截的请求数，有完整加载(非轻量模式)的平均值时估算节省的流量"""
+        try:
+            self._collect_network_log()
+            page = self._network_stats.pop(self.driver.current_window_handle, None)
+            if page is None:
+                return
+            transferred = page['bytes']
+            weights = _read_json(PAGE_WEIGHT_FILE) or {}
+
+            mode = 'light' if LIGHT_MODE else 'full'
+            stats = weights.setdefault(kind, {}).setdefault(mode, {'pages': 0, 'average': 0})
+            stats['average'] = (stats['average'] * stats['pages'] + transferred) / (stats['pages'] + 1)
+            stats['blocked'] = (stats.get('blocked', 0) * stats['pages'] + page['blocked']) / (stats['pages'] + 1)
+            stats['pages'] += 1
+
+            _write_json_atomic(PAGE_WEIGHT_FILE, weights)
+
+            message = f"本页 {page['requests']} 个请求传输 {transferred / 1024:.0f}KB"
+            if page['blocked']:
+                message += f"，拦截 {page['blocked']} 个请求"
+            baseline = weights[kind].get('full')
+            if LIGHT_MODE and baseline and baseline['pages']:
+                message += f"，比完整加载节省约 {(baseline['average'] - transferred) / 1024:.0f}KB"
+            self.logger.info(message)
+        except Exception as e:
+            self.logger.debug(f"统计页面传输量失败: {e}")
+
     def check_network_connection(self):
         """检查网络连接状态"""
         try:
@@ -166,6 +1090,112 @@ class XueXiQiangGuoAssistant:
             self.logger.warning("网络连接异常，请检查网络设置")
             return False
     
+    def navigate(self, url, ready=None, network_idle=False, timeout=None, page=None):
+        """
+        打开页面并等待页面真正可用，不使用固定的sleep
+
+        PAGE_LOAD_STRATEGY 为 eager/none 时 driver.get 不等待图片、统计等资源，页面是否可用由就绪条件判断；
+        driver.get 本身也受页面预算限制（同步的第三方脚本阻塞DOM解析时不会等满 PAGE_LOAD_TIMEOUT）；
+        离开当前页面前先统计它比完整加载提前多少秒开始使用
+
+        参数：
+            url: 要打开的地址
+            ready: 页面就绪条件，可以是 (By, value) 元素定位或接收driver的函数，默认使用 PAGE_READY 中该类页面的条件
+            network_idle: 是否额外等待页面资源请求停止增加
+            timeout: 最长等待时间，默认使用页面预算
+            page: 页面类型，对应 PAGE_BUDGETS 中的预算和 PAGE_READY 中的就绪条件
+
+        返回：
+            页面就绪用时(秒)
+        """
+        start_time = time.time()
+        budget = timeout or PAGE_BUDGETS.get(page, WAIT_TIMEOUT)
+        self._record_load_savings()
+        self._reset_network_stats()
+        self.driver.set_page_load_timeout(budget)
+        try:
+            self.driver.get(url)
+        except TimeoutException:
+            self.logger.info(f"页面加载超过{budget}秒预算，停止加载剩余资源: {url}")
+            self.driver.execute_script("window.stop();")
+
+        self._wait_page_ready(url, start_time + budget, ready, page, network_idle)
+
+        elapsed = time.time() - start_time
+        self.driver.execute_script("window.__xuexiReadyAt = performance.now();")
+        self.logger.info(f"页面就绪用时{elapsed:.2f}秒: {url}")
+        return elapsed
+
+    def _wait_page_ready(self, url, deadline, ready=None, page=None, network_idle=False):
+        """
+        在 deadline 之前依次等待DOM就绪、就绪条件和网络空闲，任何一步超出预算都停止加载剩余资源
+
+        DOM就绪和网络空闲超时后继续使用页面；就绪条件超时说明页面不可用，停止加载后抛出 TimeoutException
+        """
+        def wait(condition):
+            WebDriverWait(self.driver, max(0.5, deadline - time.time()), poll_frequency=0.2).until(condition)
+
+        def stop(reason):
+            self.logger.info(f"{reason}，停止加载剩余资源: {url}")
+            self.driver.execute_script("window.stop();")
+
+        if ready is None and page in PAGE_READY:
+            ready = lambda d: d.execute_script(PROBE_SELECTORS_SCRIPT, PAGE_READY[page])
+
+        try:
+            wait(lambda d: d.execute_script("return document.readyState") in ('interactive', 'complete'))
+        except TimeoutException:
+            stop("页面超出预算仍未完成DOM解析")
+        if ready is not None:
+            try:
+                wait(ready if callable(ready) else EC.presence_of_element_located(ready))
+            except TimeoutException:
+                stop("页面超出预算仍未就绪")
+                raise
+        if network_idle:
+            try:
+                wait(self._network_idle_condition())
+            except TimeoutException:
+                stop("页面超出预算仍在加载资源")
+
+    def _record_load_savings(self):
+        """
+        按导航计时统计当前页面比等完整加载(load事件)提前多少秒开始使用，记入 load_savings
+
+        页面在离开前仍未加载完时，按到现在为止的时间计算（实际节省的更多）
+        """
+        try:
+            timing = self.driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+        except Exception as e:
+            self.logger.debug(f"读取导航计时失败: {e}")
+            return None
+        if not timing:
+            return None
+        # 只记录一次，避免同一个页面重复统计
+        self.driver.execute_script("window.__xuexiReadyAt = 0;")
+        if timing['load'] is None:
+            saved = timing['now'] - timing['ready']
+            self.logger.info(f"页面停留结束时仍未加载完，至少提前{saved:.1f}秒开始使用")
+        else:
+            saved = max(0, timing['load'] - timing['ready'])
+            self.logger.info(f"完整加载用时{timing['load']:.1f}秒，提前{saved:.1f}秒开始使用页面")
+        self.load_savings.append(saved)
+        return saved
+
+    def _network_idle_condition(self):
+        """返回一个等待条件：页面资源请求数量在 NETWORK_IDLE_TIME 内不再增加"""
+        state = {'count': -1, 'since': time.time()}
+
+        def condition(driver):
+            count = driver.execute_script("return performance.getEntriesByType('resource').length")
+            if count != state['count']:
+                state['count'] = count
+                state['since'] = time.time()
+                return False
+            return time.time() - state['since'] >= NETWORK_IDLE_TIME
+
+        return condition
+
     def extract_login_qrcode(self, output_path=None):
         """
         提取学习强国登录页面的二维码图片并保存到文件
@@ -181,8 +1211,7 @@ class XueXiQiangGuoAssistant:
             # 确保页面已加载到登录页
             if "login.html" not in self.driver.current_url:
                 self.logger.info("正在跳转到登录页面...")
-                self.driver.get("https://pc.xuexi.cn/points/login.html")
-                time.sleep(3)
+                self.navigate(LOGIN_URL, (By.ID, "ddlogin-iframe"), page='login')
             
             # 切换到登录iframe
             wait = WebDriverWait(self.driver, WAIT_TIMEOUT)
@@ -191,22 +1220,10 @@ class XueXiQiangGuoAssistant:
             
             # 查找二维码图片元素
             try:
-                # 尝试多种可能的选择器
-                qr_selectors = [
-                    '//*[@id="app"]/div/div[1]/div/div[1]/div[1]/img',
-                    '//img[contains(@src, "base64")]',
-                    '//div[contains(@class, "qrcode")]//img'
-                ]
-                
-                qr_element = None
-                for selector in qr_selectors:
-                    try:
-                        qr_element = wait.until(EC.presence_of_element_located((By.XPATH, selector)))
-                        if qr_element:
-                            break
-                    except:
-                        continue
-                
+                # 同时检查多种可能的选择器
+                _, qr_element = self._probe_selectors(
+                    'login_qrcode', [{"type": "xpath", "value": xpath} for xpath in LOGIN_QRCODE_XPATHS])
+
                 if not qr_element:
                     self.logger.error("未找到二维码元素")
                     return None
@@ -250,10 +1267,9 @@ class XueXiQiangGuoAssistant:
         try:
             # 确保在xuexi.cn域名下
             current_url = self.driver.current_url
-            if "xuexi.cn" not in current_url:
+            if SITE_DOMAIN not in current_url:
                 # 导航到学习强国主页来检查cookie
-                self.driver.get("https://www.xuexi.cn")
-                time.sleep(2)
+                self.navigate(HOME_URL, page='home')
             
             # 获取xuexi.cn域名下的所有cookie
             cookies = self.driver.get_cookies()
@@ -265,7 +1281,7 @@ class XueXiQiangGuoAssistant:
                 cookie_value = cookie.get('value', '')
                 
                 # 检查常见的token cookie名称
-                if any(token_key in cookie_name for token_key in ['token', 'access_token', 'auth', 'session', 'login']):
+                if any(token_key in cookie_name for token_key in TOKEN_COOKIE_KEYS):
                     if cookie_value and len(cookie_value) > 10:  # token通常比较长
                         self.logger.info(f"发现有效token: {cookie_name}")
                         token_found = True
@@ -274,8 +1290,9 @@ class XueXiQiangGuoAssistant:
             if token_found:
                 # 进一步验证：尝试访问需要登录的页面
                 try:
-                    self.driver.get("https://pc.xuexi.cn/points/my-points.html")
-                    time.sleep(3)
+                    # 等到积分内容出现或被重定向到登录页
+                    self.navigate(POINTS_URL, lambda d: "login.html" in d.current_url or
+                                  d.find_elements(By.CLASS_NAME, "my-points-content"), page='points')
                     
                     # 检查是否被重定向到登录页面
                     current_url = self.driver.current_url
@@ -297,40 +1314,56 @@ class XueXiQiangGuoAssistant:
             self.logger.error(f"检查登录状态时出错: {e}")
             return False
 
-    def wait_for_login(self):
-        """等待用户登录成功"""
+    def _login_token_values(self):
+        """只读取当前浏览器中登录token类cookie的值，不跳转页面"""
+        return {cookie.get('name', ''): cookie.get('value', '')
+                for cookie in self.driver.get_cookies()
+                if any(key in cookie.get('name', '').lower() for key in TOKEN_COOKIE_KEYS)
+                and len(cookie.get('value', '')) > 10}
+
+    def wait_for_login(self, timeout=None):
+        """
+        等待用户登录成功
+
+        在登录页中注入脚本监听URL、cookie和登录iframe消息，事件发生后立即返回，
+        等待期间不会离开二维码页面
+        """
+        if timeout is None:
+            timeout = LOGIN_TIMEOUT
+
         try:
             self.logger.info("请使用学习强国APP扫描二维码登录...")
             self.logger.info("等待登录成功...")
-            
-            timeout = 300  # 5分钟超时
-            wait_end_time = time.time() + timeout
-            check_count = 0
+
+            start_time = time.time()
+            wait_end_time = start_time + timeout
+            initial_tokens = self._login_token_values()
+            self.driver.set_script_timeout(LOGIN_EVENT_TIMEOUT)
 
             while time.time() < wait_end_time:
-                # 使用更严格的登录状态检查
-                if self.check_login_status():
-                    self.logger.info("登录验证成功！")
-                    return True
+                try:
+                    # 页面内提前1秒自行结束，不让驱动超时后留下仍在运行的定时器
+                    reason = self.driver.execute_async_script(LOGIN_WATCH_SCRIPT, (LOGIN_EVENT_TIMEOUT - 1) * 1000)
+                except TimeoutException:
+                    reason = 'timeout'
+                except WebDriverException:
+                    # 页面跳转会中断正在等待的脚本，这本身就是登录事件
+                    reason = 'navigation'
+                if reason == 'timeout':
+                    self.logger.info("仍在等待登录...")
+                    continue
 
-                # 每10秒检查一次
-                time.sleep(10)
-                check_count += 1
-
-                # 每30秒提醒一次
-                if check_count % 3 == 0:
-                    self.logger.info("仍在等待登录...如果已登录成功，请输入 'y' 确认")
-                    user_input = input("已登录成功？(y/n): ").lower().strip()
-                    if user_input == 'y':
-                        # 用户确认后也要验证登录状态
-                        if self.check_login_status():
-                            self.logger.info("用户确认并验证登录成功！")
-                            return True
-                        else:
-                            self.logger.warning("用户确认登录，但验证失败，请重新登录")
+                current_url = self.driver.current_url
+                tokens = self._login_token_values()
+                if "login.html" not in current_url or (tokens and tokens != initial_tokens):
+                    self.logger.info(f"登录验证成功！（触发事件: {reason}，"
+                                     f"等待{time.time() - start_time:.1f}秒）")
+                    return True
 
             # 超时处理
             self.logger.warning("登录等待超时")
+            if not self.interactive:
+                return False
             user_input = input("是否已成功登录？(y/n): ").lower().strip()
             if user_input == 'y':
                 # 最后验证一次
@@ -343,11 +1376,68 @@ class XueXiQiangGuoAssistant:
 
         except Exception as e:
             self.logger.error(f"检测登录状态时出错: {e}")
+            if not self.interactive:
+                return False
             user_input = input("登录状态检测出错，是否已成功登录？(y/n): ").lower().strip()
             if user_input == 'y':
                 return self.check_login_status()
             return False
 
+    def login(self):
+        """
+        打开学习强国并完成登录，已登录时直接返回
+
+        返回：
+            是否登录成功
+        """
+        # 在第一次跳转之前恢复保存的会话
+        restored = self.session_store.restore(self.driver, self.account)
+
+        # 打开学习强国登录页面
+        self.logger.info("正在打开学习强国...")
+        self.navigate(HOME_URL, page='home')
+        
+        # 检查是否已经登录（使用更严格的检查）
+        if self.check_login_status():
+            self.logger.info("检测到已登录状态，直接进入学习页面")
+            self.session_store.save(self.driver, self.account)
+            return True
+
+        if restored:
+            # 本地未过期但服务端已失效的会话，删除后重新扫码
+            self.logger.info("保存的登录会话已失效，需要重新扫码")
+            self.session_store.clear(self.account)
+
+        # 未登录，跳转到登录页面
+        self.logger.info("未检测到登录状态，跳转到登录页面")
+        self.navigate(LOGIN_URL, (By.ID, "ddlogin-iframe"), page='login')
+
+        # 提取并显示二维码，多账号时每个账号单独保存
+        qr_name = f"login_qrcode_{self.account}.png" if self.account else "login_qrcode.png"
+        qr_path = self.extract_login_qrcode(
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), qr_name))
+        if qr_path and not self.interactive:
+            # 后台运行时不弹出图片窗口，由用户自行打开二维码文件
+            self.logger.info(f"二维码已保存，请打开后使用学习强国APP扫描: {qr_path}")
+        elif qr_path:
+            try:
+                img = Image.open(qr_path)
+                img.show()
+                self.logger.info("二维码已显示，请使用学习强国APP扫描")
+            except:
+                self.logger.info(f"无法自动显示图片，请手动查看: {qr_path}")
+        
+        # 等待登录
+        logged_in = self.wait_for_login()
+        # 清理二维码文件
+        if qr_path and os.path.exists(qr_path):
+            os.remove(qr_path)
+        if logged_in:
+            self.session_store.save(self.driver, self.account)
+        else:
+            self.logger.error("登录失败或超时")
+        return logged_in
+
     def launch_xuexi_website(self):
         """启动学习强国网站"""
         try:
@@ -359,348 +1449,910 @@ class XueXiQiangGuoAssistant:
             if not self.initialize_driver():
                 return
 
-            # 打开学习强国登录页面
-            self.logger.info("正在打开学习强国...")
-            self.driver.get("https://www.xuexi.cn")
-            time.sleep(3)
-            
-            # 检查是否已经登录（使用更严格的检查）
-            if self.check_login_status():
-                self.logger.info("检测到已登录状态，直接进入学习页面")
-                self.show_menu()
-                return
-
-            # 未登录，跳转到登录页面
-            self.logger.info("未检测到登录状态，跳转到登录页面")
-            self.driver.get("https://pc.xuexi.cn/points/login.html")
-            time.sleep(3)
-
-            # 提取并显示二维码
-            qr_path = self.extract_login_qrcode()
-            if qr_path:
-                try:
-                    img = Image.open(qr_path)
-                    img.show()
-                    self.logger.info("二维码已显示，请使用学习强国APP扫描")
-                except:
-                    self.logger.info(f"无法自动显示图片，请手动查看: {qr_path}")
-            
-            # 等待登录
-            if self.wait_for_login():
-                # 清理二维码文件
-                if qr_path and os.path.exists(qr_path):
-                    os.remove(qr_path)
+            if self.login():
                 self.show_menu()
-            else:
-                self.logger.error("登录失败或超时")
 
         except Exception as e:
             self.logger.error(f"启动学习强国时发生错误: {e}")
         finally:
             self.quit_driver()
     
-    def read_articles(self, num_articles=6, start_index=0):
+    def run_unattended(self, num_articles=None, num_videos=None):
+        """
+        无人值守运行：启动浏览器、登录，然后全自动学习或只完成指定数量的文章和视频
+
+        返回：
+            退出码（EXIT_*）
+        """
+        try:
+            if not self.initialize_driver():
+                return EXIT_BROWSER_FAILED
+            if not self.login():
+                return EXIT_LOGIN_FAILED
+
+            if num_articles is None and num_videos is None:
+                success = self.run_automatic_learning()
+                # 以最终积分为准，积分接口和积分页都读不到时也视为没有完成
+                score = self.check_score(verbose=False)
+                if any(score[kind]['current'] < score[kind]['target'] for kind in ('article', 'video')):
+                    self.logger.warning("最终积分显示学习任务没有全部完成")
+                    success = False
+            else:
+                # read_articles/watch_videos 只有完成了指定数量才返回True
+                success = True
+                if num_articles:
+                    success = self.read_articles(num_articles) and success
+                if num_videos:
+                    success = self.watch_videos(num_videos) and success
+                self.check_score(verbose=False)
+            return EXIT_OK if success else EXIT_INCOMPLETE
+        except Exception as e:
+            self.logger.error(f"无人值守运行时发生错误: {e}")
+            return EXIT_INCOMPLETE
+        finally:
+            self.quit_driver()
+
+    def read_articles(self, num_articles=6, start_index=0, concurrent_tabs=None):
         """
         阅读文章获取积分
 
         参数：
             num_articles: 要阅读的文章数量
-            start_index: 从文章列表的第几篇文章开始阅读
+            start_index: 跳过内容目录中前几篇未读的文章
+            concurrent_tabs: 同时打开的文章标签页数量，默认使用 CONCURRENT_TABS
+
+        返回：
+            是否读完了 num_articles 篇文章
         """
         if not self.driver:
             self.logger.error("浏览器未初始化，请先调用 initialize_driver()")
             return False
+
+        if concurrent_tabs is None:
+            concurrent_tabs = CONCURRENT_TABS
+        if concurrent_tabs > 1:
+            return self._read_articles_concurrently(num_articles, start_index, concurrent_tabs)
             
         try:
-            # 跳转到新闻页面
-            self.logger.info("正在跳转到新闻页面...")
-            self.driver.get("https://www.xuexi.cn")
-            
-            time.sleep(2)
+            # 从内容目录中挑选没有读过的文章
+            targets = self.pick_targets('article', num_articles, start_index)
+            self.logger.info(f"计划阅读{len(targets)}篇文章")
+
+            completed = 0
+            for i, target in enumerate(targets):
+                next_target = targets[i + 1] if i + 1 < len(targets) else None
+                if self._run_item(f"阅读文章《{target['title']}》",
+                                  lambda: self._read_article(target, next_target=next_target), target):
+                    completed += 1
+
+            return self._report_completed('文章', completed, num_articles)
+        except Exception as e:
+            self.logger.error(f"阅读文章时发生错误: {e}")
+            return False
+        finally:
+            self._close_work_tab()
 
-            # 等待文章列表加载
-            article_links = WebDriverWait(self.driver, 30).until(
-                EC.presence_of_all_elements_located((By.XPATH, "//div[@class='text-link-item-title']"))
-            )
+    def _report_completed(self, name, completed, requested):
+        """记录完成数量，返回是否完成了要求的数量"""
+        if completed < requested:
+            self.logger.warning(f"{name}只完成了 {completed}/{requested} 个")
+            return False
+        self.logger.info(f"{name}全部完成（{completed} 个）")
+        return True
+
+    def _read_article(self, target, read_time=None, next_target=None):
+        """
+        在复用的标签页中打开一篇文章并模拟阅读，read_time 默认由 article_read_seconds() 决定
+
+        next_target 为下一篇文章，阅读期间在后台标签页中预先加载
+        """
+        self._open_in_work_tab(target['url'], page='article')
+        if next_target:
+            self._prefetch(next_target['url'])
+
+        # 模拟阅读行为，随机滚动页面
+        if read_time is None:
+            read_time = article_read_seconds()
+        self.logger.info(f"正在阅读第 {target['index'] + 1} 篇文章，阅读时间：{read_time}秒")
+
+        if AUTONOMOUS_DWELL:
+            self._autonomous_dwell('article', read_time)
+        else:
+            end_time = time.time() + read_time
+            while time.time() < end_time:
+                # 随机滚动页面
+                scroll_height = random.randint(100, 500)
+                self.driver.execute_script(f"window.scrollBy(0, {scroll_height});")
+                time.sleep(max(0, min(random.uniform(2, 5), end_time - time.time())))
+        self._record_page_weight('article')
+
+    def _start_autonomous_dwell(self, kind, seconds):
+        """在当前标签页中注入停留脚本，之后滚动和继续播放都由页面自己完成"""
+        self.driver.execute_script(AUTO_DWELL_SCRIPT, kind, seconds)
+
+    def _check_autonomous_dwell(self, kind, end_time):
+        """
+        心跳检查当前标签页的停留脚本，页面刷新导致脚本丢失时按剩余时间重新注入
+
+        返回：
+            停留脚本的状态，重新注入时为None
+        """
+        status = self.driver.execute_script(DWELL_STATUS_SCRIPT)
+        if status is None and end_time - time.time() > 1:
+            self.logger.debug("停留脚本已丢失，重新注入")
+            self._start_autonomous_dwell(kind, end_time - time.time())
+        return status
+
+    def _autonomous_dwell(self, kind, seconds):
+        """在当前标签页停留 seconds 秒，期间每 DWELL_HEARTBEAT 秒检查一次页面内的停留脚本"""
+        end_time = time.time() + seconds
+        self._start_autonomous_dwell(kind, seconds)
+        status = None
+        while time.time() < end_time:
+            time.sleep(max(0, min(DWELL_HEARTBEAT, end_time - time.time())))
+            try:
+                status = self._check_autonomous_dwell(kind, end_time) or status
+            except Exception as e:
+                self.logger.debug(f"检查停留脚本失败: {e}")
+        if status:
+            self.logger.debug(f"停留结束：滚动{status['scrolls']}次，继续播放{status['resumes']}次")
+    
+    def _read_articles_concurrently(self, num_articles, start_index, concurrent_tabs):
+        """
+        并发阅读文章：同时保持多个文章标签页打开，轮流在各标签页中滚动，
+        每篇文章单独计时，达到阅读时间后关闭并补开下一篇
+        """
+        try:
+            targets = self.pick_targets('article', num_articles, start_index)
+            self.logger.info(f"计划并发阅读{len(targets)}篇文章（{concurrent_tabs}个标签页）")
+
+            list_handle = self.driver.current_window_handle
+            streams = [{
+                'pending': targets,
+                'open': self._open_article_tab,
+                'max_tabs': concurrent_tabs,
+            }]
+            report = self._dwell_in_tabs(streams, list_handle)
+            return self._report_completed('文章', len(report), num_articles)
+        except Exception as e:
+            self.logger.error(f"并发阅读文章时发生错误: {e}")
+            try:
+                self.driver.switch_to.window(self.driver.window_handles[0])
+            except:
+                pass
+            return False
+
+    def pick_targets(self, kind, count, start_index=0):
+        """
+        挑选本账号还没有学习过的文章或视频
+
+        内容目录有效且未学习的条目足够时直接使用，否则先打开列表页刷新目录
+
+        参数：
+            kind: 'article' 或 'video'
+            count: 需要的条目数量
+            start_index: 跳过前几个未学习的条目
+        """
+        name = '文章' if kind == 'article' else '视频'
+        targets = self.catalog.pick(kind, count, start_index)
+        if len(targets) >= count and self.catalog.is_fresh(kind):
+            self.logger.info(f"使用内容目录缓存，跳过列表页加载（{len(targets)}个未学习的{name}）")
+            return targets
+
+        if kind == 'article':
+            harvested = self.harvest_articles(CATALOG_REFRESH_LIMIT)
+        else:
+            harvested = self.harvest_videos(CATALOG_REFRESH_LIMIT)
+        if harvested:
+            self.catalog.update(kind, harvested)
+
+        targets = self.catalog.pick(kind, count, start_index)
+        if len(targets) < count:
+            self.logger.warning(f"未学习的{name}只剩 {len(targets)} 个")
+        return targets
+
+    def plan_video_targets(self, num_videos):
+        """根据内容目录中的视频时长，挑选 num_videos 个总观看时间最短的未看视频"""
+        # 确保视频目录有效，必要时刷新
+        self.pick_targets('video', num_videos)
+        candidates = self.catalog.pick('video', len(self.catalog.items('video')))
+        plan = plan_videos(candidates, num_videos * VIDEO_POINTS_PER_VIDEO)
+        if plan['videos']:
+            self.logger.info(f"视频计划：{plan['page_loads']} 个视频，预计用时"
+                             f"{plan['planned_seconds'] / 60:.1f}分钟")
+        return plan
+
+    def harvest_articles(self, count, start_index=0):
+        """打开首页，一次性取出要阅读的文章地址列表"""
+        self.logger.info("正在跳转到新闻页面...")
+        self.navigate(HOME_URL, (By.XPATH, ARTICLE_LIST_XPATH), page='home')
+        return self._harvest_targets(ARTICLE_LIST_SELECTOR, count, start_index)
+
+    def harvest_videos(self, count, start_index=0):
+        """打开视频列表页，一次性取出要观看的视频地址列表"""
+        self.logger.info("正在跳转到视频页面...")
+        self.navigate(VIDEO_CHANNEL_URL, network_idle=True, page='video_list')
+
+        # 等待视频列表加载 - 调整选择器以匹配视频列表项
+        self.logger.info("等待视频列表加载...")
+        selector, _ = self._locate_video_list()
+        if not selector:
+            self.logger.error("无法找到视频列表")
+            return []
+        return self._harvest_targets(selector, count, start_index)
+
+    def _harvest_targets(self, selector, count, start_index=0):
+        """
+        从当前列表页取出要访问的条目地址
+
+        DOM中没有链接的条目点击一次记录打开的地址，之后都按地址直接访问
+
+        返回：
+            [{'index', 'title', 'url'}] 列表
+        """
+        items = self._extract_list_items(selector)
+        if not items:
+            return []
+
+        picked = [items[(i + start_index) % len(items)] for i in range(min(count, len(items)))]
+        list_handle = self.driver.current_window_handle
+        list_url = self.driver.current_url
+        for item in picked:
+            if item['url']:
+                continue
+            try:
+                handle, _ = self._click_into_new_tab(selector, item['index'])
+                if handle:
+                    self.driver.switch_to.window(handle)
+                    WebDriverWait(self.driver, WAIT_TIMEOUT).until(
+                        lambda d: d.current_url not in ('', 'about:blank'))
+                    item['url'] = self.driver.current_url
+                    self.driver.close()
+                    self.driver.switch_to.window(list_handle)
+                elif self.driver.current_url != list_url:
+                    # 在当前标签页中跳转的条目，记录地址后回到列表页
+                    item['url'] = self.driver.current_url
+                    self.navigate(list_url, self._selector_locator(selector))
+            except Exception as e:
+                self.logger.debug(f"获取第 {item['index'] + 1} 项地址失败: {e}")
+                self.driver.switch_to.window(list_handle)
 
-            # 阅读指定数量的文章
-            read_count = min(len(article_links), num_articles)
-            self.logger.info(f"找到{len(article_links)}篇文章，计划阅读{read_count}篇，从第{start_index + 1}篇开始")
+        targets = [{'index': item['index'], 'title': item['title'], 'url': item['url'],
+                    'duration': item.get('duration')}
+                   for item in picked if item['url']]
+        if len(targets) < len(picked):
+            self.logger.warning(f"{len(picked) - len(targets)} 个条目无法获取地址，已跳过")
+        return targets
 
-            for i in range(read_count):
-                # 重新获取文章列表，避免StaleElementReferenceException
-                article_links = WebDriverWait(self.driver, 30).until(
-                    EC.presence_of_all_elements_located((By.XPATH, "//div[@class='text-link-item-title']"))
-                )
+    def _run_item(self, label, action, target=None):
+        """
+        执行单个条目的任务，失败时按 ITEM_RETRIES 重试，成功后记入学习记录，返回是否成功
 
-                # 计算实际的文章索引，使用模运算确保不会超出范围
-                actual_index = (i + start_index) % len(article_links)
-                self.logger.info(f"正在阅读第 {actual_index + 1}/{len(article_links)} 篇文章")
+        每个条目的开始和结束都写入检查点日志
+        """
+        kind = (target or {}).get('type') or ('video' if '视频' in label else 'article')
+        if target:
+            self.journal.item_started(kind, target)
+        start_time = time.time()
+        for attempt in range(ITEM_RETRIES + 1):
+            try:
+                played = action()
+                if target:
+                    self.catalog.mark_consumed(target)
+                    self.journal.item_finished(kind, target, time.time() - start_time,
+                                               played=played if isinstance(played, (int, float)) else None)
+                return True
+            except Exception as e:
+                self.logger.warning(f"{label}失败（第{attempt + 1}次）: {e}")
+        if target:
+            self.journal.item_finished(kind, target, time.time() - start_time, success=False)
+        return False
 
-                # 点击对应索引的文章
-                article_links[actual_index].click()
+    def _open_in_work_tab(self, url, page=None):
+        """
+        在复用的工作标签页中打开地址，工作标签页不存在时新建
 
-                # 切换到新窗口
-                self.driver.switch_to.window(self.driver.window_handles[-1])
+        地址已经在后台标签页中预先加载时，关闭原工作标签页并切换过去，不再等待加载
+        """
+        handle = self._prefetched.pop(url, None)
+        if handle and handle in self.driver.window_handles:
+            if self._work_handle and self._work_handle != handle and self._work_handle in self.driver.window_handles:
+                self.driver.switch_to.window(self._work_handle)
+                self._record_load_savings()
+                self.driver.close()
+            self.driver.switch_to.window(handle)
+            self._work_handle = handle
+            start_time = time.time()
+            self._wait_page_ready(url, start_time + PAGE_BUDGETS.get(page, WAIT_TIMEOUT), page=page)
+            self.driver.execute_script("window.__xuexiReadyAt = performance.now();")
+            self.logger.info(f"切换到预加载的页面，等待{time.time() - start_time:.2f}秒: {url}")
+            return
+
+        if self._work_handle not in self.driver.window_handles:
+            self.driver.switch_to.new_window('tab')
+            self._work_handle = self.driver.current_window_handle
+            self._apply_light_mode()
+        else:
+            self.driver.switch_to.window(self._work_handle)
+        self.navigate(url, page=page)
+
+    def _prefetch(self, url):
+        """
+        在后台标签页中开始加载下一个条目，不等待加载完成，焦点留在当前标签页
 
-                # 模拟阅读行为，随机滚动页面
-                read_time = 70 + random.randint(-10, 10)  # 阅读文章时间(秒)
-                self.logger.info(f"阅读时间：{read_time}秒")
+        新标签页先应用轻量模式再跳转，跳转由页面脚本发起，命令立即返回
+        """
+        if not PREFETCH_NEXT or url in self._prefetched:
+            return
+        current_handle = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.new_window('tab')
+            self._prefetched[url] = self.driver.current_window_handle
+            self._apply_light_mode()
+            self.driver.execute_script("window.location.href = arguments[0];", url)
+        except Exception as e:
+            self.logger.debug(f"预加载失败: {e}")
+        finally:
+            self.driver.switch_to.window(current_handle)
 
-                end_time = time.time() + read_time
-                while time.time() < end_time:
-                    # 随机滚动页面
-                    scroll_height = random.randint(100, 500)
-                    self.driver.execute_script(f"window.scrollBy(0, {scroll_height});")
-                    time.sleep(random.uniform(2, 5))
+    def _close_prefetched(self):
+        """关闭没有用到的预加载标签页"""
+        for handle in self._prefetched.values():
+            try:
+                if handle in self.driver.window_handles:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+            except Exception:
+                pass
+        self._prefetched = {}
 
-                # 关闭当前文章窗口，回到文章列表
+    def _close_work_tab(self):
+        """关闭工作标签页和预加载标签页，回到第一个标签页"""
+        self._close_prefetched()
+        try:
+            if self._work_handle and self._work_handle in self.driver.window_handles:
+                self.driver.switch_to.window(self._work_handle)
+                self._record_load_savings()
                 self.driver.close()
+            self._work_handle = None
+            if self.driver.window_handles:
                 self.driver.switch_to.window(self.driver.window_handles[0])
-                
-                time.sleep(1)
+        except:
+            pass
 
-            self.logger.info("文章阅读完成！")
-            return True
+    def _open_url_in_new_tab(self, url, page=None):
+        """新建标签页打开地址，返回标签页句柄；页面没有就绪时关闭新标签页并抛出异常"""
+        previous_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        try:
+            self._apply_light_mode()
+            self.navigate(url, page=page)
+        except Exception:
+            self.driver.close()
+            self.driver.switch_to.window(previous_handle)
+            raise
+        return self.driver.current_window_handle
+
+    def _extract_list_items(self, selector):
+        """
+        一次脚本调用取出列表中所有条目
+
+        返回：
+            [{'index', 'title', 'url', 'target'}] 列表
+        """
+        return self.driver.execute_script(LIST_ITEMS_SCRIPT, selector["type"], selector["value"]) or []
+
+    def _click_list_item(self, selector, index):
+        """在页面内定位并点击列表的第 index 项，返回列表长度(列表为空时返回0)"""
+        return self.driver.execute_script(CLICK_LIST_ITEM_SCRIPT, selector["type"], selector["value"], index)
+
+    def _click_into_new_tab(self, selector, index):
+        """
+        点击列表项并返回新打开的标签页
+
+        返回：
+            (新标签页句柄或None, 列表长度)
+        """
+        known_handles = set(self.driver.window_handles)
+        count = self._click_list_item(selector, index)
+
+        new_handles = [h for h in self.driver.window_handles if h not in known_handles]
+        return (new_handles[0] if new_handles else None), count
+
+    def _open_article_tab(self, target):
+        """在新标签页中按地址打开文章，返回标签页信息"""
+        try:
+            handle = self._open_url_in_new_tab(target['url'], page='article')
         except Exception as e:
-            self.logger.error(f"阅读文章时发生错误: {e}")
-            return False
-    
-    def watch_videos(self, num_videos=6, start_index=0):
+            self.logger.warning(f"打开第 {target['index'] + 1} 篇文章失败，跳过: {e}")
+            return None
+
+        read_time = article_read_seconds()
+        self.logger.info(f"已打开第 {target['index'] + 1} 篇文章，计划阅读{read_time}秒")
+        return {
+            'handle': handle,
+            'kind': 'article',
+            'target': target,
+            'label': f"第 {target['index'] + 1} 篇文章",
+            'start': time.time(),
+            'dwell_time': read_time,
+            'player': None,
+        }
+
+    def _open_video_tab(self, target):
+        """在新标签页中按地址打开视频并开始静音播放，返回标签页信息"""
+        try:
+            handle = self._open_url_in_new_tab(target['url'], page='video')
+        except Exception as e:
+            self.logger.warning(f"打开第 {target['index'] + 1} 个视频失败，跳过: {e}")
+            return None
+
+        video_player, watch_time = self._start_video_playback(target)
+        self.logger.info(f"已打开第 {target['index'] + 1} 个视频，计划观看{watch_time}秒")
+        return {
+            'handle': handle,
+            'kind': 'video',
+            'target': target,
+            'label': f"第 {target['index'] + 1} 个视频",
+            'start': time.time(),
+            'dwell_time': watch_time,
+            'player': video_player,
+        }
+
+    def _dwell_in_tabs(self, streams, home_handle):
         """
-        观看视频获取积分
+        在同一个WebDriver下轮流照看多个标签页，直到所有标签页都停留足够时间
+
+        参数：
+            streams: 任务流列表，每项包含 pending(待打开的条目)、
+                     open(根据条目打开标签页的函数)、max_tabs(同时打开的数量)
+            home_handle: 每轮结束后切回的标签页
+
+        返回：
+            每个标签页的停留记录列表
+
+        打开失败的条目放回 pending 末尾，按 ITEM_RETRIES 重试，仍然失败时在检查点日志中记为失败
+        """
+        open_tabs = []
+        report = []
+        open_failures = {}
+
+        while True:
+            # 为每个任务流补开标签页，直到达到各自的并发数量
+            for stream_id, stream in enumerate(streams):
+                while stream['pending'] and sum(1 for t in open_tabs if t['stream'] == stream_id) < stream['max_tabs']:
+                    target = stream['pending'].pop(0)
+                    tab = stream['open'](target)
+                    if not tab:
+                        open_failures[target['url']] = open_failures.get(target['url'], 0) + 1
+                        if open_failures[target['url']] <= ITEM_RETRIES:
+                            stream['pending'].append(target)
+                        else:
+                            self.logger.warning(f"《{target.get('title')}》打开失败{open_failures[target['url']]}次，放弃")
+                            self.journal.item_finished(target.get('type'), target, 0, success=False)
+                        continue
+                    tab['stream'] = stream_id
+                    open_tabs.append(tab)
+                    self.journal.item_started(tab['kind'], tab['target'])
+                    if AUTONOMOUS_DWELL:
+                        self._start_autonomous_dwell(tab['kind'], tab['dwell_time'] - (time.time() - tab['start']))
+
+            if not open_tabs:
+                break
+
+            # 轮流处理每个标签页：文章滚动，视频检查是否暂停；到时间的标签页关闭
+            for tab in list(open_tabs):
+                self.driver.switch_to.window(tab['handle'])
+                if tab['player'] is not None:
+                    # 取出视频事件：暂停时继续播放，播放结束后只再停留 VIDEO_END_MARGIN 秒
+                    try:
+                        state = self._next_video_events(0)
+                        if state is None:
+                            # 播放器被替换，重新安装监听，之前播放的时长另外记下
+                            if self._reinstall_video_monitor(1):
+                                tab['played_before'] = tab.get('played') or 0
+                        elif state:
+                            tab['played'] = tab.get('played_before', 0) + state['played']
+                            if self._handle_video_events(state, tab['label']):
+                                tab['dwell_time'] = min(tab['dwell_time'],
+                                                        round(time.time() - tab['start'] + VIDEO_END_MARGIN, 1))
+                    except Exception as e:
+                        self.logger.debug(f"读取{tab['label']}的播放事件失败: {e}")
+                dwell = time.time() - tab['start']
+                if dwell >= tab['dwell_time']:
+                    self._record_page_weight(tab['kind'])
+                    self._record_load_savings()
+                    self.driver.close()
+                    open_tabs.remove(tab)
+                    self.catalog.mark_consumed(tab['target'])
+                    self.journal.item_finished(tab['kind'], tab['target'], dwell, played=tab.get('played'))
+                    report.append({'label': tab['label'], 'kind': tab['kind'], 'dwell': dwell,
+                                   'planned': tab['dwell_time'], 'played': tab.get('played')})
+                    self.logger.info(f"{tab['label']}完成，停留{dwell:.1f}秒（计划{tab['dwell_time']}秒）")
+                    continue
+
+                try:
+                    if AUTONOMOUS_DWELL:
+                        self._check_autonomous_dwell(tab['kind'], tab['start'] + tab['dwell_time'])
+                    elif tab['kind'] == 'article':
+                        scroll_height = random.randint(100, 500)
+                        self.driver.execute_script(f"window.scrollBy(0, {scroll_height});")
+                except Exception as e:
+                    self.logger.debug(f"处理{tab['label']}时出错: {e}")
+
+            self.driver.switch_to.window(home_handle)
+            if open_tabs:
+                # 最多等到最近一个标签页到时间，避免多等
+                next_due = min(t['start'] + t['dwell_time'] for t in open_tabs) - time.time()
+                # 停留脚本在页面内自行滚动，只需按心跳间隔检查
+                interval = DWELL_HEARTBEAT if AUTONOMOUS_DWELL else random.uniform(2, 5)
+                time.sleep(max(0.5, min(interval, next_due)))
+
+        if report:
+            self.logger.info("各标签页停留时间:")
+            for item in report:
+                played = f"，实际播放{item['played']:.1f}秒" if item['played'] is not None else ""
+                self.logger.info(f"  {item['label']}: {item['dwell']:.1f}秒 / 计划{item['planned']}秒{played}")
+        return report
+
+    def learn_interleaved(self, num_articles=6, num_videos=6, article_start=0):
+        """
+        文章与视频交替进行：一个视频标签页静音播放的同时，轮流阅读多个文章标签页
 
         参数：
+            num_articles: 要阅读的文章数量
             num_videos: 要观看的视频数量
-            start_index: 从视频列表的第几个视频开始观看
+            article_start: 跳过内容目录中前几篇未读的文章
         """
         if not self.driver:
             self.logger.error("浏览器未初始化，请先调用 initialize_driver()")
             return False
-            
+
         try:
-            # 跳转到视频页面
-            self.logger.info("正在跳转到视频页面...")
-            self.driver.get("https://www.xuexi.cn/4426aa87b0b64ac671c96379a3a8bd26/db086044562a57b441c24f2af1c8e101.html")
-            
-            time.sleep(3)
-
-            # 等待视频列表加载 - 调整选择器以匹配视频列表项
-            self.logger.info("等待视频列表加载...")
-
-            # 尝试多种选择器
-            selector_options = [
-                {"type": "xpath", "value": "//div[contains(@class, 'thePic')][@data-link-target]"},
-                {"type": "xpath", "value": "//div[contains(@class, 'textWrapper')][@data-link-target]"},
-                {"type": "xpath", "value": "//div[contains(@class, 'grid-cell')]//div[contains(@class, 'innerPic')]"},
-                {"type": "css", "value": ".grid-gr .grid-cell"}
-            ]
-
-            # 尝试每个选择器
-            current_selector = None
-            for selector in selector_options:
-                try:
-                    if selector["type"] == "xpath":
-                        video_links = WebDriverWait(self.driver, 30).until(
-                            EC.presence_of_all_elements_located((By.XPATH, selector["value"]))
-                        )
-                    else:
-                        video_links = WebDriverWait(self.driver, 30).until(
-                            EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector["value"]))
-                        )
-
-                    if video_links and len(video_links) > 0:
-                        self.logger.info(f"找到 {len(video_links)} 个视频，使用选择器: {selector['value']}")
-                        current_selector = selector  # 保存成功的选择器
-                        break
-                except Exception as e:
-                    self.logger.debug(f"选择器 {selector['value']} 未找到元素")
+            streams = []
+            home_handle = self.driver.current_window_handle
+
+            # 先把两个列表页的地址都取出来，之后只按地址打开
+            if num_articles > 0:
+                article_targets = self.pick_targets('article', num_articles, article_start)
+                streams.append({
+                    'pending': article_targets,
+                    'open': self._open_article_tab,
+                    'max_tabs': max(1, CONCURRENT_TABS),
+                })
+                self.logger.info(f"计划阅读{len(article_targets)}篇文章")
+
+            if num_videos > 0:
+                video_targets = [item for item, _ in self.plan_video_targets(num_videos)['videos']]
+                if video_targets:
+                    streams.append({
+                        'pending': video_targets,
+                        'open': self._open_video_tab,
+                        'max_tabs': 1,
+                    })
+                    self.logger.info(f"计划观看{len(video_targets)}个视频")
+                else:
+                    self.logger.error("无法找到视频列表，本轮只阅读文章")
 
-            if not current_selector:
-                self.logger.error("无法找到视频列表，任务无法完成")
-                return False
+            report = self._dwell_in_tabs(streams, home_handle)
+            article_done = sum(1 for item in report if item['kind'] == 'article')
+            video_done = sum(1 for item in report if item['kind'] == 'video')
+            self.logger.info(f"交替学习完成：文章 {article_done} 篇，视频 {video_done} 个")
+            return True
+        except Exception as e:
+            self.logger.error(f"交替学习过程中发生错误: {e}")
+            return False
+        finally:
+            try:
+                if self.driver.window_handles:
+                    self.driver.switch_to.window(self.driver.window_handles[0])
+            except:
+                pass
 
-            # 观看指定数量的视频
-            watch_count = min(len(video_links), num_videos)
-            self.logger.info(f"计划观看{watch_count}个视频，从第{start_index + 1}个开始")
+    def _selector_locator(self, selector):
+        """把 {"type", "value"} 形式的选择器转换成 (By, value)"""
+        if selector["type"] == "xpath":
+            return By.XPATH, selector["value"]
+        return By.CSS_SELECTOR, selector["value"]
 
-            for i in range(watch_count):
-                # 重新获取视频列表，使用成功的选择器
-                try:
-                    if current_selector["type"] == "xpath":
-                        video_links = WebDriverWait(self.driver, 30).until(
-                            EC.presence_of_all_elements_located((By.XPATH, current_selector["value"]))
-                        )
-                    else:
-                        video_links = WebDriverWait(self.driver, 30).until(
-                            EC.presence_of_all_elements_located((By.CSS_SELECTOR, current_selector["value"]))
-                        )
-
-                    # 计算实际的视频索引，使用模运算确保不会超出范围
-                    actual_index = (i + start_index) % len(video_links)
-                    self.logger.info(f"正在观看第 {actual_index + 1}/{len(video_links)} 个视频")
-
-                    # 确保元素可点击
-                    try:
-                        if current_selector["type"] == "xpath":
-                            WebDriverWait(self.driver, 10).until(
-                                EC.element_to_be_clickable((By.XPATH, current_selector["value"]))
-                            )
-                        else:
-                            WebDriverWait(self.driver, 10).until(
-                                EC.element_to_be_clickable((By.CSS_SELECTOR, current_selector["value"]))
-                            )
-                    except Exception as e:
-                        self.logger.debug(f"等待元素可点击时出错: {e}")
+    def _probe_selectors(self, page, candidates, timeout=None):
+        """
+        在页面内一次检查所有候选选择器，直到其中一个有匹配或超时
 
-                    # 使用JavaScript点击元素
-                    try:
-                        self.driver.execute_script("arguments[0].click();", video_links[actual_index])
-                    except Exception as e:
-                        self.logger.warning(f"点击视频时出错，尝试替代方法: {e}")
-                        try:
-                            video_links[actual_index].click()
-                        except:
-                            self.logger.error("替代点击方法也失败，跳过此视频")
-                            continue
-
-                    # 切换到新窗口
-                    try:
-                        if len(self.driver.window_handles) > 1:
-                            self.driver.switch_to.window(self.driver.window_handles[-1])
-                        else:
-                            self.logger.info("没有新窗口打开，继续处理当前页面")
-                    except Exception as e:
-                        self.logger.error(f"切换窗口时出错: {e}")
-                        continue
+        上次命中的选择器优先检查，命中的选择器记入选择器缓存
 
-                    # 等待视频加载并播放
-                    try:
-                        # 尝试多个可能的视频选择器
-                        video_selectors = ["//video", "//div[contains(@class,'outter')]//video", "//div[@id='ji-player']"]
-                        video_player = None
-
-                        for selector in video_selectors:
-                            try:
-                                video_player = WebDriverWait(self.driver, 30).until(
-                                    EC.presence_of_element_located((By.XPATH, selector))
-                                )
-                                if video_player:
-                                    break
-                            except:
-                                continue
-
-                        if video_player:
-                            # 设置视频静音
-                            self.driver.execute_script("arguments[0].muted = true;", video_player)
-                            self.logger.info("已将视频设为静音模式")
-
-                            # 确保视频开始播放
-                            self.driver.execute_script("arguments[0].play();", video_player)
-                            
-                            # 等待视频加载并获取时长
-                            video_duration = 0
-                            wait_duration_time = time.time() + 10
-                            while time.time() < wait_duration_time:
-                                try:
-                                    video_duration = self.driver.execute_script("return arguments[0].duration", video_player)
-                                    if video_duration and video_duration > 0 and not math.isnan(video_duration):
-                                        break
-                                except:
-                                    pass
-                                time.sleep(1)
-                            
-                            # 根据视频时长决定观看时间
-                            if video_duration and video_duration > 0:
-                                minutes = int(video_duration // 60)
-                                seconds = int(video_duration % 60)
-                                self.logger.info(f"检测到视频时长: {minutes}分{seconds}秒 ({video_duration:.1f}秒)")
-                                
-                                watch_time = int(video_duration) + random.randint(5, 10)
-                                
-                                if watch_time > 300:  # 如果超过5分钟
-                                    watch_time = 300    # 直接设置为5分钟
-                            else:
-                                self.logger.info("无法获取视频时长，使用默认观看时间")
-                                watch_time = 180 + random.randint(-15, 15)
-                            
-                            # 检查视频是否真的在播放
-                            is_playing = self.driver.execute_script(
-                                "return arguments[0].paused === false && arguments[0].currentTime > 0",
-                                video_player
-                            )
-
-                            if not is_playing:
-                                self.logger.info("尝试手动开始播放视频")
-                                play_buttons = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'play')]")
-                                if play_buttons:
-                                    play_buttons[0].click()
-                    except Exception as e:
-                        self.logger.error(f"播放视频时出错: {e}")
-                        watch_time = 180 + random.randint(-15, 15)
+        参数：
+            page: 页面名称，选择器缓存按页面记录
+            candidates: {"type", "value"} 选择器列表
 
-                    self.logger.info(f"观看时间：{watch_time}秒")
-                    
-                    # 观看视频，并定期检查播放状态
-                    end_time = time.time() + watch_time
-                    while time.time() < end_time:
-                        remaining_time = end_time - time.time()
-                        
-                        # 只在距离结束还有超过30秒时进行滚动
-                        if remaining_time > 30:
-                            scroll_height = random.randint(100, 400)
-                            self.driver.execute_script(f"window.scrollBy(0, {scroll_height});")
-                            
-                            time.sleep(random.uniform(2, 5))
-                            if random.random() > 0.5:  # 50%的概率滚回一些距离
-                                back_scroll = random.randint(50, scroll_height)
-                                self.driver.execute_script(f"window.scrollBy(0, -{back_scroll});")
-                        
-                        # 每隔15-30秒检查一次视频是否仍在播放
-                        check_interval = random.uniform(15, 30)
-                        check_interval = min(check_interval, remaining_time)
-                        time.sleep(check_interval)
-                        
-                        try:
-                            if video_player:
-                                is_paused = self.driver.execute_script("return arguments[0].paused", video_player)
-                                if is_paused:
-                                    self.logger.info("视频已暂停，尝试继续播放")
-                                    self.driver.execute_script("arguments[0].play();", video_player)
-                        except:
-                            pass
-                    
-                    # 观看结束，确保视频在可见区域
-                    try:
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", video_player)
-                    except Exception as e:
-                        self.logger.debug(f"滚动到视频位置失败: {e}")
+        返回：
+            (命中的选择器, 第一个匹配的元素)，超时返回 (None, None)
+        """
+        ordered = self.selectors.ordered(page, candidates)
+        try:
+            result = WebDriverWait(self.driver, timeout or WAIT_TIMEOUT).until(
+                lambda d: d.execute_script(PROBE_SELECTORS_SCRIPT, ordered))
+        except TimeoutException:
+            return None, None
+        selector = ordered[result['index']]
+        self.selectors.remember(page, selector)
+        return selector, result['element']
+
+    def _locate_video_list(self):
+        """在视频列表页同时检查多种选择器，返回 (命中的选择器, 视频条目列表)"""
+        selector, _ = self._probe_selectors('video_list', VIDEO_LIST_SELECTORS)
+        if not selector:
+            return None, []
+        video_links = self._extract_list_items(selector)
+        if video_links:
+            self.logger.info(f"找到 {len(video_links)} 个视频，使用选择器: {selector['value']}")
+            return selector, video_links
+        return None, []
+
+    def _start_video_playback(self, target=None):
+        """
+        在当前标签页中找到视频播放器，静音并开始播放
 
-                    # 关闭当前视频窗口，回到视频列表
-                    try:
-                        self.driver.close()
-                        self.driver.switch_to.window(self.driver.window_handles[0])
-                    except Exception as e:
-                        self.logger.error(f"关闭视频窗口时出错: {e}")
-                        if len(self.driver.window_handles) > 0:
-                            self.driver.switch_to.window(self.driver.window_handles[0])
-                    time.sleep(1)
+        参数：
+            target: 正在观看的视频条目，检测到时长后记入内容目录
+
+        返回：
+            (视频元素或None, 计划观看时间秒数)
+        """
+        video_player = None
+        try:
+            # 同时检查多个可能的视频选择器
+            _, video_player = self._probe_selectors(
+                'video_player', [{"type": "xpath", "value": xpath} for xpath in VIDEO_PLAYER_XPATHS])
+
+            if not video_player:
+                self.logger.info("未找到视频播放器，使用默认观看时间")
+                return None, default_video_watch_seconds()
+
+            # 设置视频静音
+            self.driver.execute_script("arguments[0].muted = true;", video_player)
+            self.logger.info("已将视频设为静音模式")
+
+            # 确保视频开始播放
+            self.driver.execute_script("arguments[0].play();", video_player)
+
+            if LIGHT_MODE:
+                quality = self.driver.execute_script(VIDEO_LOW_QUALITY_SCRIPT)
+                if quality:
+                    self.logger.info(f"已切换到最低清晰度: {quality}")
+
+            # 安装事件监听，等待 loadedmetadata 事件获取时长
+            video_duration = self._install_video_monitor(video_player)
+            wait_duration_time = time.time() + 10
+            while not video_duration and time.time() < wait_duration_time:
+                state = self._next_video_events(wait_duration_time - time.time())
+                if state is None:
+                    break
+                video_duration = state['duration']
+
+            # 根据视频时长决定观看时间
+            if video_duration and video_duration > 0 and not math.isnan(video_duration):
+                minutes = int(video_duration // 60)
+                seconds = int(video_duration % 60)
+                self.logger.info(f"检测到视频时长: {minutes}分{seconds}秒 ({video_duration:.1f}秒)")
+                if target:
+                    self.catalog.set_duration(target['url'], round(video_duration, 1))
+
+                watch_time = int(video_duration) + VIDEO_END_MARGIN + random.randint(0, 5)
+
+                if watch_time > video_watch_limit():  # 如果超过最长观看时间
+                    watch_time = video_watch_limit()    # 直接设置为最长观看时间
+            else:
+                self.logger.info("无法获取视频时长，使用默认观看时间")
+                watch_time = default_video_watch_seconds()
+
+            # 检查视频是否真的在播放
+            is_playing = self.driver.execute_script(
+                "return arguments[0].paused === false && arguments[0].currentTime > 0",
+                video_player
+            )
+
+            if not is_playing:
+                self.logger.info("尝试手动开始播放视频")
+                play_buttons = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'play')]")
+                if play_buttons:
+                    play_buttons[0].click()
+
+            return video_player, watch_time
+        except Exception as e:
+            self.logger.error(f"播放视频时出错: {e}")
+            return video_player, default_video_watch_seconds()
+    
+    def _install_video_monitor(self, video_player):
+        """在视频元素上安装事件监听，返回已知的视频时长(秒)，还未加载元数据时返回None"""
+        return self.driver.execute_script(VIDEO_MONITOR_SCRIPT, video_player)
+
+    def _reinstall_video_monitor(self, timeout):
+        """
+        页面刷新或播放器被替换导致事件监听丢失时，重新找到播放器，静音播放并安装监听
+
+        返回：
+            是否重新安装了监听
+        """
+        _, video_player = self._probe_selectors(
+            'video_player', [{"type": "xpath", "value": xpath} for xpath in VIDEO_PLAYER_XPATHS], timeout)
+        if not video_player:
+            return False
+        self.driver.execute_script("arguments[0].muted = true; arguments[0].play();", video_player)
+        self._install_video_monitor(video_player)
+        return True
+
+    def _next_video_events(self, wait=0):
+        """
+        等待当前标签页中视频的事件，有事件时立即返回，最多等待 wait 秒
+
+        返回：
+            {'events', 'played', 'current', 'duration', 'paused', 'ended'}，
+            没有安装监听或页面已跳转时返回None
+        """
+        self.driver.set_script_timeout(wait + 5)
+        try:
+            return self.driver.execute_async_script(VIDEO_EVENTS_SCRIPT, int(max(0, wait) * 1000))
+        except WebDriverException:
+            return None
+
+    def _handle_video_events(self, state, label):
+        """对视频事件做出反应：暂停时立即继续播放，返回视频是否已播放结束"""
+        types = [event['type'] for event in state['events']]
+        if 'stalled' in types:
+            self.logger.info(f"{label}缓冲卡顿")
+        if state['paused'] and not state['ended'] and 'pause' in types:
+            self.logger.info(f"{label}已暂停，继续播放")
+            self.driver.execute_script(VIDEO_RESUME_SCRIPT)
+        return state['ended']
+
+    def _monitor_video(self, label, watch_time):
+        """
+        按视频事件观看 watch_time 秒：暂停时立即继续播放，播放结束后只再停留 VIDEO_END_MARGIN 秒，
+        播放进度停滞超过 VIDEO_STALL_TIMEOUT 秒时抛出异常以便重试
+
+        返回：
+            实际播放的秒数，无法读取播放状态时返回None
+        """
+        end_time = time.time() + watch_time
+        state = None
+        played = 0
+        # 重新安装监听后播放时长从0开始，加上之前已播放的部分
+        played_before = 0
+        progress_time = time.time()
+        while time.time() < end_time:
+            # 停留脚本在页面内滚动时只需按心跳等待事件，否则每15-30秒由这里滚动一次
+            interval = DWELL_HEARTBEAT if AUTONOMOUS_DWELL else random.uniform(15, 30)
+            result = self._next_video_events(min(interval, end_time - time.time()))
+            if result is None:
+                self.logger.debug("视频事件监听已丢失或播放器已替换，重新查找播放器")
+                try:
+                    if self._reinstall_video_monitor(max(1, min(interval, end_time - time.time()))):
+                        played_before = played
+                        continue
                 except Exception as e:
-                    self.logger.error(f"重新获取视频列表时出错: {e}")
-                    continue
+                    self.logger.debug(f"重新安装视频事件监听失败: {e}")
+                time.sleep(max(0, min(interval, end_time - time.time())))
+                continue
+            state = result
+
+            if self._handle_video_events(state, label) and end_time - time.time() > VIDEO_END_MARGIN:
+                self.logger.info(f"{label}已播放结束")
+                end_time = time.time() + VIDEO_END_MARGIN
+            if played_before + state['played'] > played or state['ended']:
+                played = played_before + state['played']
+                progress_time = time.time()
+            elif time.time() - progress_time > VIDEO_STALL_TIMEOUT:
+                raise RuntimeError(f"视频播放停滞超过{VIDEO_STALL_TIMEOUT}秒")
+
+            if not AUTONOMOUS_DWELL and end_time - time.time() > 30:
+                self.driver.execute_script(f"window.scrollBy(0, {random.randint(100, 400)});")
+
+        if state is None:
+            return None
+        self.logger.info(f"{label}实际播放{played:.1f}秒")
+        return played
 
-            self.logger.info("视频观看完成！")
-            return True
+    def watch_videos(self, num_videos=6):
+        """
+        观看视频获取积分
+
+        参数：
+            num_videos: 要观看的视频数量，具体观看哪些视频由 plan_videos() 按时长挑选
+
+        返回：
+            是否看完了 num_videos 个视频
+        """
+        if not self.driver:
+            self.logger.error("浏览器未初始化，请先调用 initialize_driver()")
+            return False
+            
+        try:
+            # 按时长挑选没有看过的视频，总观看时间最短
+            plan = self.plan_video_targets(num_videos)
+            targets = [item for item, _ in plan['videos']]
+            if not targets:
+                self.logger.error("没有可观看的视频，任务无法完成")
+                return False
+
+            self.logger.info(f"计划观看{len(targets)}个视频")
+
+            start_time = time.time()
+            completed = 0
+            for i, target in enumerate(targets):
+                next_target = targets[i + 1] if i + 1 < len(targets) else None
+                if self._run_item(f"观看视频《{target['title']}》",
+                                  lambda: self._watch_video(target, next_target=next_target), target):
+                    completed += 1
+
+            self.logger.info(f"视频计划用时{plan['planned_seconds'] / 60:.1f}分钟，"
+                             f"实际用时{(time.time() - start_time) / 60:.1f}分钟")
+            return self._report_completed('视频', completed, num_videos)
         except Exception as e:
             self.logger.error(f"观看视频时发生错误: {e}")
-            if len(self.driver.window_handles) > 0:
-                self.driver.switch_to.window(self.driver.window_handles[0])
             return False
-    
+        finally:
+            self._close_work_tab()
+
+    def _watch_video(self, target, watch_time=None, next_target=None):
+        """
+        在复用的标签页中打开一个视频并观看，watch_time 默认根据视频时长决定
+
+        next_target 为下一个视频，当前视频开始播放后在后台标签页中预先加载
+        """
+        self._open_in_work_tab(target['url'], page='video')
+        self.logger.info(f"正在观看第 {target['index'] + 1} 个视频")
+
+        # 等待视频加载并播放
+        video_player, planned_time = self._start_video_playback(target)
+        if next_target:
+            self._prefetch(next_target['url'])
+        if watch_time is None:
+            watch_time = planned_time
+
+        self.logger.info(f"观看时间：{watch_time}秒")
+
+        if video_player is not None:
+            if AUTONOMOUS_DWELL:
+                self._start_autonomous_dwell('video', watch_time)
+            played = self._monitor_video(f"第 {target['index'] + 1} 个视频", watch_time)
+            if not AUTONOMOUS_DWELL:
+                # 观看结束，确保视频在可见区域
+                try:
+                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", video_player)
+                except Exception as e:
+                    self.logger.debug(f"滚动到视频位置失败: {e}")
+            self._record_page_weight('video')
+            return played
+
+        if AUTONOMOUS_DWELL:
+            self._autonomous_dwell('video', watch_time)
+            self._record_page_weight('video')
+            return None
+
+        # 没有找到播放器时只模拟浏览，定期滚动页面
+        end_time = time.time() + watch_time
+        while time.time() < end_time:
+            # 只在距离结束还有超过30秒时进行滚动
+            if end_time - time.time() > 30:
+                scroll_height = random.randint(100, 400)
+                self.driver.execute_script(f"window.scrollBy(0, {scroll_height});")
+
+                time.sleep(random.uniform(2, 5))
+                if random.random() > 0.5:  # 50%的概率滚回一些距离
+                    back_scroll = random.randint(50, scroll_height)
+                    self.driver.execute_script(f"window.scrollBy(0, -{back_scroll});")
+
+            time.sleep(max(0, min(random.uniform(15, 30), end_time - time.time())))
+        self._record_page_weight('video')
+        return None
+
     def check_score(self, verbose=False):
         """
         查看当前学习积分，并返回文章和视频的积分状态
         verbose: 是否显示详细信息
+
+        优先在已登录的浏览器中直接请求积分接口，失败时再打开积分页面解析
         """
         if not self.driver:
             self.logger.error("浏览器未初始化，请先调用 initialize_driver()")
@@ -708,87 +2360,81 @@ class XueXiQiangGuoAssistant:
                 'article': {'current': 0, 'target': 12},
                 'video': {'current': 0, 'target': 12}
             }
-            
+
+        score_items = self._fetch_score_items()
+        if score_items:
+            if verbose:
+                self.logger.info(f"积分详情: 积分接口返回 {len(score_items)} 项")
+            return self._summarize_score_items(score_items, verbose)
+
+        if verbose:
+            self.logger.info("积分接口不可用，改为解析积分页面")
+        return self._check_score_from_page(verbose)
+
+    def _fetch_score_items(self):
+        """
+        在浏览器中用页面自身的cookie请求积分接口
+
+        返回：
+            [(标题, "当前/目标")] 列表，失败时返回None
+        """
         try:
-            # 跳转到积分页面
-            self.logger.info("正在检查积分状态...")
-            self.driver.get("https://pc.xuexi.cn/points/my-points.html")
-            
-            time.sleep(3)
+            start_time = time.time()
+            # 请求需要携带xuexi.cn的cookie，当前不在该域名下时先打开首页
+            if SITE_DOMAIN not in self.driver.current_url:
+                self.navigate(HOME_URL, page='home')
+
+            self.driver.set_script_timeout(SCORE_API_TIMEOUT)
+            data = self.driver.execute_async_script(SCORE_FETCH_SCRIPT, SCORE_API_URL)
+
+            score_items = score_items_from_api(data)
+            if not score_items:
+                return None
+            self.logger.debug(f"积分接口用时{time.time() - start_time:.2f}秒")
+            return score_items
+        except Exception as e:
+            self.logger.debug(f"请求积分接口失败: {e}")
+            return None
 
-            # 等待积分数据加载
-            WebDriverWait(self.driver, 30).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "my-points-content"))
-            )
+    def _summarize_score_items(self, score_items, verbose=False):
+        """把 [(标题, "当前/目标")] 解析成文章和视频的积分状态"""
+        # 只有在详细模式下才打印所有卡片
+        if verbose:
+            self.logger.info("所有积分卡片标题:")
+            for i, (title, progress) in enumerate(score_items):
+                self.logger.info(f"{i + 1}. {title}: {progress}")
 
-            # 提取各项积分详情
-            article_points = {'current': 0, 'target': 12}
-            video_points = {'current': 0, 'target': 12}
+        score_status, failures = parse_score_items(score_items)
+        if verbose:
+            for name, progress, error in failures:
+                self.logger.warning(f"解析{name}积分失败: {progress}, 错误: {error}")
 
-            try:
-                score_cards = self.driver.find_elements(By.CLASS_NAME, "my-points-card")
+        # 简洁的积分汇总
+        self.logger.info(f"积分进度: 文章 {score_status['article']['current']}/{score_status['article']['target']} | " +
+              f"视频 {score_status['video']['current']}/{score_status['video']['target']}")
 
-                if verbose:
-                    self.logger.info(f"积分详情: 找到 {len(score_cards)} 个积分卡片")
+        return score_status
 
-                # 只有在详细模式下才打印所有卡片
-                if verbose:
-                    self.logger.info("所有积分卡片标题:")
-                    for i, card in enumerate(score_cards):
-                        try:
-                            title = card.find_element(By.CLASS_NAME, "my-points-card-title").text
-                            progress = card.find_element(By.CLASS_NAME, "my-points-card-text").text
-                            self.logger.info(f"{i + 1}. {title}: {progress}")
-                        except:
-                            pass
-
-                # 解析积分详情
-                for card in score_cards:
-                    try:
-                        title = card.find_element(By.CLASS_NAME, "my-points-card-title").text
-                        progress = card.find_element(By.CLASS_NAME, "my-points-card-text").text
-
-                        # 提取文章和视频的积分情况
-                        if "选读文章" in title or "阅读文章" in title or "我要选读文章" in title:
-                            try:
-                                current, target = progress.split("/")
-                                # 移除非数字字符再转换
-                                current_clean = ''.join(filter(str.isdigit, current))
-                                target_clean = ''.join(filter(str.isdigit, target))
-
-                                article_points['current'] = int(current_clean)
-                                article_points['target'] = int(target_clean)
-                            except Exception as e:
-                                if verbose:
-                                    self.logger.warning(f"解析文章积分失败: {progress}, 错误: {e}")
-                        elif ("视听学习" in title or "视频" in title) and (
-                                "时长" in title or "分钟" in title or "我要" in title):
-                            try:
-                                current, target = progress.split("/")
-                                # 移除非数字字符再转换
-                                current_clean = ''.join(filter(str.isdigit, current))
-                                target_clean = ''.join(filter(str.isdigit, target))
-
-                                video_points['current'] = int(current_clean)
-                                video_points['target'] = int(target_clean)
-                            except Exception as e:
-                                if verbose:
-                                    self.logger.warning(f"解析视频积分失败: {progress}, 错误: {e}")
-                    except Exception as e:
-                        if verbose:
-                            self.logger.warning(f"获取积分卡片详情失败: {e}")
+    def _check_score_from_page(self, verbose=False):
+        """打开积分页面，从积分卡片中解析积分状态"""
+        try:
+            # 跳转到积分页面
+            self.logger.info("正在检查积分状态...")
+            # 等待积分卡片加载
+            self.navigate(POINTS_URL, (By.CLASS_NAME, "my-points-card"), page='points')
 
-                # 简洁的积分汇总
-                self.logger.info(f"积分进度: 文章 {article_points['current']}/{article_points['target']} | " +
-                      f"视频 {video_points['current']}/{video_points['target']}")
+            score_items = []
+            try:
+                # 一次脚本调用取出所有卡片的标题和进度
+                score_items = [tuple(card) for card in self.driver.execute_script(SCORE_CARDS_SCRIPT) or []]
+
+                if verbose:
+                    self.logger.info(f"积分详情: 找到 {len(score_items)} 个积分卡片")
             except Exception as e:
                 if verbose:
                     self.logger.error(f"获取积分详情失败: {e}")
 
-            return {
-                'article': article_points,
-                'video': video_points
-            }
+            return self._summarize_score_items(score_items, verbose)
         except Exception as e:
             if verbose:
                 self.logger.error(f"查看积分时发生错误: {e}")
@@ -827,20 +2473,38 @@ class XueXiQiangGuoAssistant:
             else:
                 print("无效选择，请重新输入")
     
-    def run_automatic_learning(self):
-        """全自动学习"""
+    def run_automatic_learning(self, interleave=None):
+        """
+        全自动学习
+
+        参数：
+            interleave: 是否让视频与文章交替进行，默认使用 INTERLEAVE_TASKS
+        """
+        if interleave is None:
+            interleave = INTERLEAVE_TASKS
+
         if not self.driver:
             self.logger.error("浏览器未初始化，请先调用 initialize_driver()")
             return False
             
         try:
             self.logger.info("===== 开始全自动学习 =====")
+            self._resume_from_checkpoint()
+            self.journal.record('start')
 
             # 初始化检查积分状态
             score_status = self.check_score(verbose=False)
+            last_progress = None
+            idle_rounds = 0
 
             # 持续检查直到所有任务完成
             while True:
+                if not self._driver_alive():
+                    raise WebDriverException("浏览器已断开")
+                self.journal.record('score', score=score_status)
+                # 保存最新的会话，崩溃后重新运行时不需要扫码
+                self.session_store.save(self.driver, self.account)
+
                 # 计算所需的阅读文章和观看视频数量
                 article_target = score_status['article']['target']
                 article_current = score_status['article']['current']
@@ -860,11 +2524,25 @@ class XueXiQiangGuoAssistant:
                     self.logger.info("✅ 所有学习任务已完成！")
                     break
 
-                # 自动完成文章阅读任务，从已阅读的文章数量开始
+                # 连续几轮积分都没有变化（例如没有未学习的内容），停止以免空转
+                progress = (article_current, video_current)
+                idle_rounds = idle_rounds + 1 if progress == last_progress else 0
+                last_progress = progress
+                if idle_rounds >= MAX_IDLE_ROUNDS:
+                    self.logger.warning(f"连续{idle_rounds}轮积分没有变化，停止全自动学习")
+                    self.journal.record('finish', completed=False, reason='idle')
+                    return False
+
+                if interleave:
+                    # 视频静音播放的同时阅读文章，一轮结束后再统一检查积分
+                    self.learn_interleaved(min(6, article_remaining), min(6, video_remaining))
+                    score_status = self.check_score(verbose=False)
+                    continue
+
+                # 自动完成文章阅读任务，内容目录会跳过已经读过的文章
                 if article_remaining > 0:
                     batch_articles = min(6, article_remaining)
-                    # 传递已获得的文章积分作为起始索引
-                    self.read_articles(batch_articles, article_current)
+                    self.read_articles(batch_articles)
 
                 # 简短地检查积分状态
                 score_status = self.check_score(verbose=False)
@@ -872,24 +2550,143 @@ class XueXiQiangGuoAssistant:
                 # 如果已完成所有任务，提前退出
                 if score_status['article']['current'] >= article_target and score_status['video']['current'] >= video_target:
                     self.logger.info("✅ 所有学习任务已完成！")
+                    self.journal.record('score', score=score_status)
                     break
 
-                # 自动完成视频观看任务，从已观看的视频数量开始
+                # 自动完成视频观看任务，内容目录会跳过已经看过的视频
                 if video_remaining > 0:
                     batch_videos = min(6, video_remaining)
-                    # 传递已获得的视频积分作为起始索引
-                    self.watch_videos(batch_videos, video_current)
+                    self.watch_videos(batch_videos)
 
                 # 再次检查积分状态
                 score_status = self.check_score(verbose=False)
-                
+
+            self.journal.record('finish', completed=True)
             return True
         except Exception as e:
             self.logger.error(f"全自动学习过程中发生错误: {e}")
+            self.journal.record('error', error=str(e))
             return False
 
+    def calibrate_dwell(self, kinds=('article', 'video')):
+        """
+        校准模式：用二分法找出能让积分增加的最短停留时间，结果保存到 DWELL_CALIBRATION_FILE
+
+        每次试探都会学习一个新条目，当天该类积分已满时无法校准，应在积分开始前运行
+
+        返回：
+            本次校准的结果字典
+        """
+        calibration = load_dwell_calibration()
+        results = {}
+        for kind in kinds:
+            result = self._calibrate_kind(kind)
+            if result:
+                results[kind] = result
+                calibration[kind] = result
+                self.logger.info(f"{'文章' if kind == 'article' else '视频'}最短停留时间约 {result['threshold']}秒，"
+                                 f"今后使用 {calibrated_dwell_value(result)}秒")
+
+        if results:
+            _write_json_atomic(DWELL_CALIBRATION_FILE, calibration)
+        return results
+
+    def _calibrate_kind(self, kind):
+        """对一种内容做二分校准，没有观察到任何一次得分时返回None"""
+        name = '文章' if kind == 'article' else '视频'
+        low, high = CALIBRATION_RANGES[kind]
+        score = self.check_score(verbose=False)[kind]
+
+        targets = self.pick_targets(kind, CALIBRATION_MAX_PROBES)
+        if kind == 'video':
+            # 视频可能在停留时间之前就播完，优先用长视频校准
+            targets.sort(key=lambda item: item.get('duration') or 0, reverse=True)
+
+        probes = []
+        for target in targets:
+            if high - low <= CALIBRATION_PRECISION:
+                break
+            if score['current'] >= score['target']:
+                self.logger.warning(f"今天的{name}积分已满，无法继续校准")
+                break
+
+            dwell = (low + high) // 2
+            self.logger.info(f"校准{name}：停留{dwell}秒（范围 {low}-{high}秒）")
+            if kind == 'article':
+                self._run_item(f"阅读文章《{target['title']}》", lambda: self._read_article(target, dwell), target)
+            else:
+                self._run_item(f"观看视频《{target['title']}》", lambda: self._watch_video(target, dwell), target)
+            self._close_work_tab()
+
+            new_score = self._wait_for_score_change(kind, score['current'])
+            credited = new_score['current'] > score['current']
+            probes.append({'dwell': dwell, 'credited': credited})
+            self.logger.info(f"停留{dwell}秒{'得分' if credited else '未得分'}")
+            if credited:
+                high = dwell
+            else:
+                low = dwell
+            score = new_score
+
+        if not any(probe['credited'] for probe in probes):
+            self.logger.warning(f"{name}校准没有观察到得分，保留原来的停留时间")
+            return None
+        return {'threshold': high, 'calibrated_at': time.time(), 'probes': probes}
+
+    def _wait_for_score_change(self, kind, current):
+        """积分可能稍后才更新，最多等待 CALIBRATION_SCORE_WAIT 秒"""
+        end_time = time.time() + CALIBRATION_SCORE_WAIT
+        while True:
+            score = self.check_score(verbose=False)[kind]
+            if score['current'] > current or time.time() >= end_time:
+                return score
+            time.sleep(5)
+
+    def _driver_alive(self):
+        """用一次最简单的脚本调用确认浏览器还能响应"""
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _resume_from_checkpoint(self):
+        """根据今天的检查点日志恢复进度：已完成的条目记入学习记录，报告上次中断的位置"""
+        completed = self.journal.completed_items()
+        if not self.journal.has_unfinished_run() and not completed:
+            return
+
+        for entry in completed:
+            if not self.catalog.is_consumed(entry['url']):
+                self.catalog.mark_consumed({'url': entry['url'], 'title': entry.get('title'), 'type': entry['kind']})
+
+        if self.journal.has_unfinished_run():
+            message = f"从检查点恢复：今天已完成 {len(completed)} 个条目"
+            score = self.journal.last_score()
+            if score:
+                message += (f"，上次积分 文章 {score['article']['current']}/{score['article']['target']} | "
+                            f"视频 {score['video']['current']}/{score['video']['target']}")
+            self.logger.info(message)
+            interrupted = self.journal.interrupted_item()
+            if interrupted:
+                self.logger.info(f"上次中断于《{interrupted.get('title')}》，将重新学习该条目")
+
     def quit_driver(self):
-        """关闭浏览器"""
+        """关闭浏览器，从驱动池借用的浏览器归还给驱动池"""
+        if self.driver:
+            self._record_load_savings()
+        if self.load_savings:
+            self.logger.info(f"共统计 {len(self.load_savings)} 个页面，不等完整加载共提前"
+                             f"{sum(self.load_savings):.1f}秒开始使用页面")
+            self.load_savings = []
+
+        if self._pool_lease is not None:
+            from driver_pool import release_driver
+            release_driver(self._pool_lease)
+            self.logger.info(f"浏览器 #{self._pool_lease} 已归还驱动池")
+            self._pool_lease = None
+            self.driver = None
+            return
+
         if self.driver:
             try:
                 self.driver.quit()
@@ -910,20 +2707,266 @@ def check_dependencies():
         return False
 
 
-def main():
-    """主函数"""
+def load_account_profiles(path):
+    """
+    读取多账号配置文件（JSON列表）
+
+    每项可以是账号名称字符串，或包含 name、user_data_dir 的字典
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw_profiles = json.load(f)
+
+    profiles = []
+    for item in raw_profiles:
+        if isinstance(item, str):
+            item = {'name': item}
+        profile = dict(item)
+        profile.setdefault('user_data_dir', os.path.join(PROFILES_DIR, profile['name']))
+        profiles.append(profile)
+    return profiles
+
+
+def _available_memory_mb():
+    """获取当前可用内存(MB)，无法获取时返回None"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available // (1024 * 1024)
+    except ImportError:
+        pass
+
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def default_worker_count():
+    """根据CPU核数和可用内存估算可以同时运行的浏览器数量"""
+    workers = os.cpu_count() or 1
+    memory_mb = _available_memory_mb()
+    if memory_mb is not None:
+        workers = min(workers, memory_mb // MEMORY_PER_BROWSER_MB)
+    return max(1, workers)
+
+
+def run_account(profile):
+    """
+    在独立进程中为单个账号运行全自动学习
+
+    返回：
+        包含账号名称、是否成功、最终积分、耗时、错误信息以及是否中途崩溃(crashed)的汇总字典
+    """
+    start_time = time.time()
+    summary = {'name': profile['name'], 'success': False, 'score': None, 'elapsed': 0, 'error': None,
+               'crashed': False}
+    assistant = XueXiQiangGuoAssistant(account=profile['name'],
+                                       user_data_dir=profile.get('user_data_dir'),
+                                       interactive=False)
+    try:
+        if not assistant.initialize_driver():
+            summary['error'] = "浏览器初始化失败"
+        elif not assistant.login():
+            summary['error'] = "登录失败或超时"
+        else:
+            summary['success'] = assistant.run_automatic_learning()
+            summary['score'] = assistant.check_score(verbose=False)
+        # 浏览器没能启动或学习在结束前中断，重新运行时可以从检查点继续
+        summary['crashed'] = not summary['success'] and (
+            summary['error'] == "浏览器初始化失败" or assistant.journal.has_unfinished_run())
+    except Exception as e:
+        summary['error'] = str(e)
+        summary['crashed'] = True
+    finally:
+        assistant.quit_driver()
+        summary['elapsed'] = time.time() - start_time
+    return summary
+
+
+def run_accounts(profiles, max_workers=None, config=None):
+    """
+    用有限数量的工作进程为多个账号运行全自动学习，每个进程一个浏览器
+
+    参数：
+        profiles: load_account_profiles() 返回的账号列表
+        max_workers: 最大并发进程数，默认根据CPU和内存估算
+        config: 配置项，在每个工作进程中重新应用（Windows下工作进程不继承修改过的全局配置）
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    if max_workers is None:
+        max_workers = default_worker_count()
+    max_workers = max(1, min(max_workers, len(profiles)))
+    print(f"共 {len(profiles)} 个账号，同时运行 {max_workers} 个浏览器")
+
+    results = {}
+    pending = list(profiles)
+    for attempt in range(ACCOUNT_RETRIES + 1):
+        if attempt:
+            print(f"重新运行 {len(pending)} 个中途崩溃的账号（第{attempt}次重试），将从检查点继续")
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=apply_config,
+                                 initargs=(config or {},)) as executor:
+            futures = {executor.submit(run_account, profile): profile for profile in pending}
+            for future in as_completed(futures):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # 工作进程本身崩溃
+                    summary = {'name': futures[future]['name'], 'success': False,
+                               'score': None, 'elapsed': 0, 'error': str(e), 'crashed': True}
+                results[summary['name']] = summary
+                print(f"账号 {summary['name']} 已结束（{len(results)}/{len(profiles)}）")
+        pending = [profile for profile in pending if results[profile['name']].get('crashed')]
+        if not pending:
+            break
+    summaries = list(results.values())
+
+    print("\n" + "=" * 50)
+    print("多账号运行汇总")
+    print("=" * 50)
+    for summary in sorted(summaries, key=lambda item: item['name']):
+        status = "✅ 完成" if summary['success'] else "❌ 失败"
+        score = summary['score']
+        score_text = (f"文章 {score['article']['current']}/{score['article']['target']} | "
+                      f"视频 {score['video']['current']}/{score['video']['target']}") if score else "-"
+        error_text = f" | 错误: {summary['error']}" if summary['error'] else ""
+        print(f"{summary['name']}: {status} | {score_text} | 耗时 {summary['elapsed'] / 60:.1f}分钟{error_text}")
+
+    return summaries
+
+
+def load_config(path):
+    """读取JSON配置文件，键为本模块的全局配置名（大小写均可），例如 {"article_read_time": 60}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError("配置文件必须是JSON对象")
+    return config
+
+
+def _config_type_matches(current, value):
+    """配置值的类型是否与当前值一致：浮点数配置可以用整数，默认为None的配置可以用字符串"""
+    if current is None:
+        return value is None or isinstance(value, str)
+    if isinstance(current, bool) or isinstance(value, bool):
+        return isinstance(current, bool) and isinstance(value, bool)
+    if isinstance(current, float):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(current))
+
+
+def apply_config(config):
+    """用配置项替换本模块的全局配置，未知的配置名或类型不符的值抛出 ValueError"""
+    module_globals = globals()
+    for key, value in config.items():
+        name = key.upper()
+        # 只允许替换数值、字符串、列表等配置常量，不能替换导入的模块和类
+        if name not in module_globals or \
+                not isinstance(module_globals[name], (int, float, str, list, dict, type(None))):
+            raise ValueError(f"未知的配置项: {key}")
+        current = module_globals[name]
+        if not _config_type_matches(current, value):
+            expected = 'str' if current is None else type(current).__name__
+            raise ValueError(f"配置项 {key} 的值类型应为 {expected}，实际为 {type(value).__name__}: {value!r}")
+        module_globals[name] = value
+
+
+def parse_arguments(argv=None):
+    """解析命令行参数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="学习强国自动化助手。不带参数时显示交互菜单；--auto、--articles、--videos "
+                    "或 --accounts 进入无人值守模式，不再等待键盘输入")
+    parser.add_argument('accounts_file', nargs='?', help="多账号配置文件（同 --accounts）")
+    parser.add_argument('--accounts', help="多账号配置文件，每个账号一个浏览器并发运行全自动学习")
+    parser.add_argument('--auto', action='store_true', help="全自动学习直到积分完成")
+    parser.add_argument('--calibrate', action='store_true', help="校准文章和视频的最短停留时间（在当天积分开始前运行）")
+    parser.add_argument('--articles', type=int, help="只阅读指定数量的文章")
+    parser.add_argument('--videos', type=int, help="只观看指定数量的视频")
+    parser.add_argument('--account', help="单账号运行时的账号名称（用于会话和学习记录）")
+    parser.add_argument('--config', help="JSON配置文件，覆盖 ARTICLE_READ_TIME 等全局配置")
+    parser.add_argument('--workers', type=int, help="多账号时同时运行的浏览器数量")
+    parser.add_argument('--login-timeout', type=int, help="等待扫码登录的秒数")
+    parser.add_argument('--wait-timeout', type=int, help="等待页面元素的秒数")
+    parser.add_argument('--page-load-strategy', choices=['normal', 'eager', 'none'],
+                        help="页面加载策略：normal 等所有资源，eager 只等DOM就绪，none 不等待")
+    parser.add_argument('--article-time', type=int, help="每篇文章的阅读秒数")
+    parser.add_argument('--video-time', type=int, help="视频时长未知时的观看秒数")
+    parser.add_argument('--driver-path', help="Edge驱动路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    主函数
+
+    返回：
+        退出码（EXIT_*）
+    """
+    args = parse_arguments(argv)
     print("=" * 50)
     print("学习强国自动化助手")
     print("=" * 50)
+
+    # 配置文件先生效，命令行参数再覆盖
+    config = {}
+    try:
+        if args.config:
+            config.update(load_config(args.config))
+        for option, name in (('login_timeout', 'LOGIN_TIMEOUT'), ('wait_timeout', 'WAIT_TIMEOUT'),
+                             ('page_load_strategy', 'PAGE_LOAD_STRATEGY'),
+                             ('article_time', 'ARTICLE_READ_TIME'), ('video_time', 'VIDEO_WATCH_TIME'),
+                             ('driver_path', 'EDGE_DRIVER_PATH')):
+            if getattr(args, option) is not None:
+                config[name] = getattr(args, option)
+        apply_config(config)
+    except (OSError, ValueError) as e:
+        print(f"配置无效: {e}")
+        return EXIT_CONFIG_ERROR
     
     # 检查依赖
     if not check_dependencies():
-        return
-    
+        return EXIT_BROWSER_FAILED
+
+    # 多账号批量模式: python main_ai.py --accounts accounts.json
+    accounts_file = args.accounts or args.accounts_file
+    if accounts_file:
+        try:
+            profiles = load_account_profiles(accounts_file)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"账号配置文件无效: {e}")
+            return EXIT_CONFIG_ERROR
+        summaries = run_accounts(profiles, args.workers, config)
+        return EXIT_OK if summaries and all(summary['success'] for summary in summaries) else EXIT_INCOMPLETE
+
+    # 停留时间校准模式
+    if args.calibrate:
+        assistant = XueXiQiangGuoAssistant(account=args.account, interactive=False)
+        try:
+            if not assistant.initialize_driver():
+                return EXIT_BROWSER_FAILED
+            if not assistant.login():
+                return EXIT_LOGIN_FAILED
+            return EXIT_OK if assistant.calibrate_dwell() else EXIT_INCOMPLETE
+        finally:
+            assistant.quit_driver()
+
+    # 无人值守单账号模式
+    if args.auto or args.articles is not None or args.videos is not None:
+        assistant = XueXiQiangGuoAssistant(account=args.account, interactive=False)
+        if args.auto:
+            return assistant.run_unattended()
+        return assistant.run_unattended(args.articles or 0, args.videos or 0)
+
     # 运行助手
-    assistant = XueXiQiangGuoAssistant()
+    assistant = XueXiQiangGuoAssistant(account=args.account)
     assistant.launch_xuexi_website()
+    return EXIT_OK
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
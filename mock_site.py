@@ -0,0 +1,329 @@
+"""
+本地模拟的学习强国网站，用于在没有真实网站和手机扫码的情况下测试和计时
+
+提供与真实网站结构相同的页面：
+    /points/login.html        登录页，包含 ddlogin-iframe，iframe 中是base64二维码图片，
+                              几秒后自动"扫码"并写入token cookie
+    /                         首页，text-link-item-title 文章列表
+    /video/channel.html       视频频道，grid-cell 视频列表（带时长）
+    /article/<n>.html         文章页，停留够时间后增加文章积分
+    /video/<n>.html           视频页，播放够时间后增加视听积分
+    /points/my-points.html    我的积分页，my-points-card 积分卡片
+    /api/score/days/listScoreProgress   积分接口
+
+所有时间按 MOCK_TIME_SCALE 缩放，例如 0.05 表示模拟网站上的70秒只需3.5秒。
+
+用法: python mock_site.py [端口] [时间缩放]
+然后用 mock_config() 生成的配置运行助手，例如 python main_ai.py --auto --config mock_config.json
+"""
+import base64
+import io
+import json
+import os
+import random
+import struct
+import sys
+import threading
+import uuid
+import wave
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MOCK_PORT = 8765  # 默认监听端口
+MOCK_TIME_SCALE = 0.05  # 时间缩放比例
+MOCK_ARTICLE_COUNT = 40  # 首页文章数量
+MOCK_VIDEO_COUNT = 40  # 视频频道视频数量
+MOCK_ARTICLE_CREDIT_SECONDS = 60  # 文章停留多久(缩放前)后得分
+MOCK_VIDEO_CREDIT_SECONDS = 60  # 视频播放多久(缩放前)后得分，视频更短时播完即得分
+MOCK_DAILY_TARGET = 12  # 文章和视频每天的积分上限
+MOCK_LOGIN_DELAY = 3  # 打开二维码后多久自动完成扫码(秒，不缩放)
+MOCK_TOKEN_COOKIE = "token"  # 登录token的cookie名称
+MOCK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_data")  # 在模拟网站上运行时的数据目录
+
+
+def _png_bytes(size=21):
+    """生成一张黑白方格的PNG图片，当作二维码"""
+    rows = b''.join(b'\x00' + bytes(random.choice((0, 255)) for _ in range(size)) for _ in range(size))
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 0, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def _wav_bytes(seconds):
+    """生成指定时长的静音WAV，供 <video> 元素播放并提供真实的 duration"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(1)
+        f.setframerate(8000)
+        f.writeframes(b'\x80' * int(8000 * max(1, seconds)))
+    return buffer.getvalue()
+
+
+class MockState:
+    """模拟网站的服务端状态：登录token、每个token的积分和已得分的条目"""
+
+    def __init__(self, time_scale=MOCK_TIME_SCALE, seed=0):
+        self.time_scale = time_scale
+        self.lock = threading.Lock()
+        self.tokens = set()
+        self.scores = {}
+        self.credited = set()
+        rng = random.Random(seed)
+        # 视频时长(缩放前的秒数)，60秒到6分钟
+        self.video_durations = [rng.randint(60, 360) for _ in range(MOCK_VIDEO_COUNT)]
+        self._media = {}
+
+    def reset(self):
+        with self.lock:
+            self.scores = {}
+            self.credited = set()
+
+    def login(self):
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.tokens.add(token)
+        return token
+
+    def score(self, token):
+        with self.lock:
+            return dict(self.scores.get(token, {'article': 0, 'video': 0}))
+
+    def credit(self, token, kind, item_id):
+        """条目第一次达到停留时间时加1分，达到每日上限后不再增加"""
+        with self.lock:
+            key = (token, kind, item_id)
+            score = self.scores.setdefault(token, {'article': 0, 'video': 0})
+            if key in self.credited or score[kind] >= MOCK_DAILY_TARGET:
+                return False
+            self.credited.add(key)
+            score[kind] += 1
+            return True
+
+    def media(self, item_id):
+        with self.lock:
+            if item_id not in self._media:
+                self._media[item_id] = _wav_bytes(self.video_durations[item_id] * self.time_scale)
+            return self._media[item_id]
+
+
+def _page(title, body, script=''):
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title></head>"
+            f"<body>{body}<script>{script}</script></body></html>")
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """按路径返回模拟页面"""
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _token(self):
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == MOCK_TOKEN_COOKIE and value in self.state.tokens:
+                return value
+        return None
+
+    def _send(self, body, content_type='text/html; charset=utf-8', status=200, headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _redirect(self, location):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path, query = url.path, parse_qs(url.query)
+        scale = self.state.time_scale
+
+        if path in ('/', '/index.html'):
+            items = ''.join(f"<a href='/article/{i}.html'><div class='text-link-item-title'>模拟文章 {i + 1}</div></a>"
+                            for i in range(MOCK_ARTICLE_COUNT))
+            return self._send(_page("学习强国", items))
+
+        if path == '/points/login.html':
+            return self._send(_page("登录", "<iframe id='ddlogin-iframe' src='/points/login-frame.html'></iframe>",
+                                    "window.addEventListener('message', function() { location.href = '/'; });"))
+
+        if path == '/points/login-frame.html':
+            qr = base64.b64encode(_png_bytes()).decode('ascii')
+            body = f"<div id='app'><div><div><div><div><div><img src='data:image/png;base64,{qr}'></div></div></div></div></div></div>"
+            script = ("setTimeout(function() { fetch('/mock/scan', {credentials: 'include'})"
+                      ".then(function() { parent.postMessage('login', '*'); }); }, %d);" % (MOCK_LOGIN_DELAY * 1000))
+            return self._send(_page("扫码登录", body, script))
+
+        if path == '/mock/scan':
+            token = self.state.login()
+            return self._send('{"ok": true}', 'application/json',
+                              headers={'Set-Cookie': f"{MOCK_TOKEN_COOKIE}={token}; Path=/; Max-Age=86400"})
+
+        if path == '/mock/reset':
+            self.state.reset()
+            return self._send('{"ok": true}', 'application/json')
+
+        if path == '/mock/credit':
+            token = self._token()
+            if not token:
+                return self._send('{"ok": false}', 'application/json', 401)
+            credited = self.state.credit(token, query.get('kind', [''])[0], int(query.get('id', ['0'])[0]))
+            return self._send(json.dumps({'ok': True, 'credited': credited}), 'application/json')
+
+        if path.startswith('/article/'):
+            item_id = int(path.rsplit('/', 1)[1].split('.')[0])
+            paragraphs = ''.join(f"<p>模拟文章 {item_id + 1} 的第 {i + 1} 段正文。</p>" for i in range(80))
+            script = ("setTimeout(function() { fetch('/mock/credit?kind=article&id=%d', {credentials: 'include'}); }, %d);"
+                      % (item_id, MOCK_ARTICLE_CREDIT_SECONDS * scale * 1000))
+            return self._send(_page(f"模拟文章 {item_id + 1}", f"<h1>模拟文章 {item_id + 1}</h1>{paragraphs}", script))
+
+        if path == '/video/channel.html':
+            cells = []
+            for i, duration in enumerate(self.state.video_durations):
+                cells.append(f"<div class='grid-cell'><div class='thePic' data-link-target='_blank'>"
+                             f"<a href='/video/{i}.html'>模拟视频 {i + 1}</a></div>"
+                             f"<span class='duration'>{duration // 60:02d}:{duration % 60:02d}</span></div>")
+            return self._send(_page("视频频道", f"<div class='grid-gr'>{''.join(cells)}</div>"))
+
+        if path.startswith('/video/') and path.endswith('.html'):
+            item_id = int(path.rsplit('/', 1)[1].split('.')[0])
+            script = """
+                var video = document.querySelector('video'), played = 0, last = null, sent = false;
+                function credit() {
+                    if (sent) return;
+                    sent = true;
+                    fetch('/mock/credit?kind=video&id=%d', {credentials: 'include'});
+                }
+                video.addEventListener('timeupdate', function() {
+                    if (last !== null && video.currentTime > last) played += video.currentTime - last;
+                    last = video.currentTime;
+                    if (played >= Math.min(video.duration - 0.5, %f)) credit();
+                });
+                video.addEventListener('ended', credit);
+            """ % (item_id, MOCK_VIDEO_CREDIT_SECONDS * scale)
+            return self._send(_page(f"模拟视频 {item_id + 1}",
+                                    f"<div class='outter'><video src='/media/{item_id}.wav' muted></video></div>", script))
+
+        if path.startswith('/media/'):
+            return self._send(self.state.media(int(path.rsplit('/', 1)[1].split('.')[0])), 'audio/wav')
+
+        if path == '/points/my-points.html':
+            token = self._token()
+            if not token:
+                return self._redirect('/points/login.html')
+            score = self.state.score(token)
+            cards = ''.join(f"<div class='my-points-card'><p class='my-points-card-title'>{title}</p>"
+                            f"<div class='my-points-card-text'>{score[kind]}分/{MOCK_DAILY_TARGET}分</div></div>"
+                            for kind, title in (('article', '我要选读文章'), ('video', '我要视听学习')))
+            return self._send(_page("我的积分", f"<div class='my-points-content'>{cards}</div>"))
+
+        if path == '/api/score/days/listScoreProgress':
+            token = self._token()
+            if not token:
+                return self._send('{"code": 401}', 'application/json', 401)
+            score = self.state.score(token)
+            tasks = [{'title': title, 'currentScore': score[kind], 'dayMaxScore': MOCK_DAILY_TARGET}
+                     for kind, title in (('article', '我要选读文章'), ('video', '我要视听学习'))]
+            return self._send(json.dumps({'data': {'taskProgress': tasks}}, ensure_ascii=False), 'application/json')
+
+        self._send(_page("404", "未找到页面"), status=404)
+
+
+class MockSite:
+    """在后台线程中运行的模拟网站"""
+
+    def __init__(self, port=0, time_scale=MOCK_TIME_SCALE):
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), MockRequestHandler)
+        self.server.daemon_threads = True
+        self.server.state = MockState(time_scale)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def mock_config(base_url, time_scale=MOCK_TIME_SCALE, data_dir=None):
+    """
+    生成让 main_ai 指向模拟网站、并按时间缩放调整停留时间的配置（可传给 apply_config 或写入 --config 文件）
+
+    会话、内容目录、学习记录、校准结果等数据文件都放到 data_dir（默认 MOCK_DATA_DIR），
+    不会覆盖真实运行使用的数据
+    """
+    data_dir = os.path.abspath(data_dir or MOCK_DATA_DIR)
+    return {
+        'PROFILES_DIR': os.path.join(data_dir, 'profiles'),
+        'SESSIONS_DIR': os.path.join(data_dir, 'sessions'),
+        'CATALOG_FILE': os.path.join(data_dir, 'content_catalog.json'),
+        'HISTORY_DIR': os.path.join(data_dir, 'history'),
+        'CHECKPOINT_DIR': os.path.join(data_dir, 'checkpoints'),
+        'SELECTOR_CACHE_FILE': os.path.join(data_dir, 'selector_cache.json'),
+        'DWELL_CALIBRATION_FILE': os.path.join(data_dir, 'dwell_calibration.json'),
+        'PAGE_WEIGHT_FILE': os.path.join(data_dir, 'page_weights.json'),
+        'SITE_DOMAIN': '127.0.0.1',
+        'HOME_URL': f"{base_url}/",
+        'LOGIN_URL': f"{base_url}/points/login.html",
+        'POINTS_URL': f"{base_url}/points/my-points.html",
+        'SCORE_API_URL': f"{base_url}/api/score/days/listScoreProgress?sence=score&deviceType=2",
+        'VIDEO_CHANNEL_URL': f"{base_url}/video/channel.html",
+        'ARTICLE_READ_TIME': 70 * time_scale,
+        'ARTICLE_READ_JITTER': int(10 * time_scale),
+        'VIDEO_WATCH_TIME': 180 * time_scale,
+        'VIDEO_WATCH_JITTER': int(15 * time_scale),
+        'VIDEO_MAX_WATCH': 300 * time_scale,
+        'VIDEO_END_MARGIN': max(1, int(5 * time_scale)),
+        'CALIBRATION_RANGES': {'article': (10 * time_scale, 80 * time_scale),
+                               'video': (10 * time_scale, 300 * time_scale)},
+        'CALIBRATION_PRECISION': 5 * time_scale,
+    }
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else MOCK_PORT
+    time_scale = float(sys.argv[2]) if len(sys.argv) > 2 else MOCK_TIME_SCALE
+    site = MockSite(port, time_scale)
+    with open('mock_config.json', 'w', encoding='utf-8') as f:
+        json.dump(mock_config(site.base_url, time_scale), f, indent=2)
+    print(f"模拟网站已启动: {site.base_url}（时间缩放 {time_scale}），配置已写入 mock_config.json（Ctrl+C 退出）")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+
+if __name__ == "__main__":
+    main()